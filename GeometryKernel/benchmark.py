@@ -0,0 +1,119 @@
+import random
+import sys
+import time
+
+from GeometryKernel.predicates import ORIENTATION_ERROR_SQUARED, ORIENTATION_FILTER, exact_orientation, \
+    intersection_side, orientation
+
+
+def float_orientation(ax, ay, bx, by, cx, cy):
+    determinant = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (determinant > 0) - (determinant < 0)
+
+
+# The loops below run one left-of test per triple the way the callers do, so the figures include what a
+# caller pays for a test and not only the predicate: plain floats, a call of orientation(), its float filter
+# inlined as Lab1's is_left has it without a bound, and the semi-static filter with one bound per query as
+# the locators, point_localization, find_bridge and the hull queries have it.
+
+def float_loop(triples):
+    left_count = 0
+    for ax, ay, bx, by, cx, cy in triples:
+        if (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) >= 0:
+            left_count += 1
+    return left_count
+
+
+def adaptive_loop(triples):
+    left_count = 0
+    for ax, ay, bx, by, cx, cy in triples:
+        if orientation(ax, ay, bx, by, cx, cy) >= 0:
+            left_count += 1
+    return left_count
+
+
+def inlined_loop(triples):
+    left_count = 0
+    for ax, ay, bx, by, cx, cy in triples:
+        left, right = (bx - ax) * (cy - ay), (by - ay) * (cx - ax)
+        determinant, total = left - right, left + right
+        if determinant * determinant > ORIENTATION_ERROR_SQUARED * total * total:
+            left_of = determinant > 0
+        else:
+            left_of = exact_orientation(ax, ay, bx, by, cx, cy) >= 0
+        if left_of:
+            left_count += 1
+    return left_count
+
+
+def semi_static_loop(triples, magnitude=1.0):
+    # all coordinates are at most magnitude in absolute value, the bound is computed once
+    high = ORIENTATION_FILTER * magnitude * magnitude
+    left_count = 0
+    for ax, ay, bx, by, cx, cy in triples:
+        determinant = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        if determinant > high or (determinant >= -high and orientation(ax, ay, bx, by, cx, cy) >= 0):
+            left_count += 1
+    return left_count
+
+
+def random_triples(n):
+    return [tuple(random.uniform(-1, 1) for _ in range(6)) for _ in range(n)]
+
+
+def collinear_triples(n):
+    # points of one line, rounded to floats, so the float determinant is noise around zero
+    triples = []
+    for _ in range(n):
+        slope, shift = random.uniform(-1, 1), random.uniform(-1, 1)
+        xs = [random.uniform(-1, 1) for _ in range(3)]
+        triples.append(tuple(value for x in xs for value in (x, slope * x + shift)))
+    return triples
+
+
+def time_calls(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(*argument)
+    return time.perf_counter() - start
+
+
+def time_loop(loop, triples):
+    start = time.perf_counter()
+    loop(triples)
+    return time.perf_counter() - start
+
+
+def orientation_benchmark(n):
+    for name, triples in (("random", random_triples(n)), ("collinear", collinear_triples(n))):
+        times = {loop.__name__: min(time_loop(loop, triples) for _ in range(5))
+                 for loop in (float_loop, adaptive_loop, inlined_loop, semi_static_loop)}
+        float_time = times["float_loop"]
+        wrong = sum(float_orientation(*triple) != orientation(*triple) for triple in triples)
+
+        print(f"{name:>10}: n = {n}, float {float_time / n * 1e9:.0f} ns, " + ", ".join(
+            f"{label} {times[loop] / n * 1e9:.0f} ns ({(times[loop] / float_time - 1) * 100:+.1f} %)"
+            for label, loop in (("orientation()", "adaptive_loop"), ("inlined", "inlined_loop"),
+                                ("semi-static", "semi_static_loop"))) + f", float sign wrong for {wrong}")
+
+
+def intersection_benchmark(n):
+    arguments = [tuple(random.uniform(-1, 1) for _ in range(10)) for _ in range(n)]
+
+    def float_intersection_side(ax, ay, bx, by, cx, cy, dx, dy, mx, my):
+        denominator = (ax - bx) * (cy - dy) - (ay - by) * (cx - dx)
+        x = ((ax * by - ay * bx) * (cx - dx) - (ax - bx) * (cx * dy - cy * dx)) / denominator
+        return (x > mx) - (x < mx)
+
+    float_time = min(time_calls(float_intersection_side, arguments) for _ in range(3))
+    adaptive_time = min(time_calls(intersection_side, arguments) for _ in range(3))
+
+    print(f"intersect: n = {n}, float with division {float_time / n * 1e9:.0f} ns, "
+          f"adaptive without {adaptive_time / n * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5
+    orientation_benchmark(size)
+    intersection_benchmark(size)
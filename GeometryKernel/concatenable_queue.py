@@ -0,0 +1,295 @@
+class QueueNode:
+    # Nodes are never modified after creation, so split and join can share subtrees between queues.
+    # first is the left most value of the subtree, it gives the successor of a value without a second descent
+    __slots__ = ("left", "value", "right", "height", "size", "first")
+
+    def __init__(self, left, value, right):
+        self.left = left
+        self.value = value
+        self.right = right
+        self.first = left.first if left is not None else value
+        left_height, left_size = (left.height, left.size) if left is not None else (0, 0)
+        right_height, right_size = (right.height, right.size) if right is not None else (0, 0)
+        self.height = (left_height if left_height > right_height else right_height) + 1
+        self.size = left_size + right_size + 1
+
+
+def height(node: QueueNode):
+    return node.height if node is not None else 0
+
+
+def size(node: QueueNode):
+    return node.size if node is not None else 0
+
+
+def balance(left, value, right):
+    # heights of left and right differ by at most 2
+    if height(left) > height(right) + 1:
+        if height(left.left) >= height(left.right):
+            return QueueNode(left.left, left.value, QueueNode(left.right, value, right))
+
+        middle = left.right
+        return QueueNode(QueueNode(left.left, left.value, middle.left), middle.value,
+                         QueueNode(middle.right, value, right))
+
+    if height(right) > height(left) + 1:
+        if height(right.right) >= height(right.left):
+            return QueueNode(QueueNode(left, value, right.left), right.value, right.right)
+
+        middle = right.left
+        return QueueNode(QueueNode(left, value, middle.left), middle.value,
+                         QueueNode(middle.right, right.value, right.right))
+
+    return QueueNode(left, value, right)
+
+
+def join(left, value, right):
+    left_height = height(left)
+    right_height = height(right)
+
+    if left_height > right_height + 1:
+        return balance(left.left, left.value, join(left.right, value, right))
+
+    if right_height > left_height + 1:
+        return balance(join(left, value, right.left), right.value, right.right)
+
+    return QueueNode(left, value, right)
+
+
+def split(node, index):
+    # first index values and the rest
+    if index <= 0:
+        return None, node
+    if index >= size(node):
+        return node, None
+
+    left_size = node.left.size if node.left is not None else 0
+    if index <= left_size:
+        left, right = split(node.left, index)
+        return left, join(right, node.value, node.right)
+
+    left, right = split(node.right, index - left_size - 1)
+    return join(node.left, node.value, left), right
+
+
+def split_last(node):
+    if node.right is None:
+        return node.left, node.value
+
+    rest, value = split_last(node.right)
+    return balance(node.left, node.value, rest), value
+
+
+def concatenate(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    rest, value = split_last(left)
+    return join(rest, value, right)
+
+
+def build(values, start, stop):
+    if start >= stop:
+        return None
+
+    middle = (start + stop) // 2
+    return QueueNode(build(values, start, middle), values[middle], build(values, middle + 1, stop))
+
+
+def iterate(node):
+    stack = []
+
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+
+        node = stack.pop()
+        yield node.value
+        node = node.right
+
+
+# queues up to this length are kept as plain tuples, copying those is cheaper than rebalancing a tree
+SMALL_QUEUE_SIZE = 64
+
+
+class ConcatenableQueue:
+    # Exactly one of values (a tuple) and root (an AVL tree, None for the empty queue) is in use.
+    __slots__ = ("values", "root")
+
+    def __init__(self, values=None):
+        values = tuple(values) if values is not None else ()
+
+        if len(values) <= SMALL_QUEUE_SIZE:
+            self.values = values
+            self.root = None
+        else:
+            self.values = None
+            self.root = build(values, 0, len(values))
+
+    @staticmethod
+    def from_values(values: tuple):
+        if not values:
+            return EMPTY_QUEUE
+
+        queue = ConcatenableQueue.__new__(ConcatenableQueue)
+        queue.values = values
+        queue.root = None
+        return queue
+
+    @staticmethod
+    def from_root(root):
+        if root is None or root.size <= SMALL_QUEUE_SIZE:
+            return ConcatenableQueue.from_values(tuple(iterate(root)))
+
+        queue = ConcatenableQueue.__new__(ConcatenableQueue)
+        queue.values = None
+        queue.root = root
+        return queue
+
+    def tree(self):
+        if self.values is not None:
+            return build(self.values, 0, len(self.values))
+        return self.root
+
+    def split(self, index):
+        if self.values is not None:
+            return ConcatenableQueue.from_values(self.values[:index]), \
+                ConcatenableQueue.from_values(self.values[index:])
+
+        left, right = split(self.root, index)
+        return ConcatenableQueue.from_root(left), ConcatenableQueue.from_root(right)
+
+    def __add__(self, other):
+        if self.values is not None and other.values is not None and \
+                len(self.values) + len(other.values) <= SMALL_QUEUE_SIZE:
+            return ConcatenableQueue.from_values(self.values + other.values)
+
+        return ConcatenableQueue.from_root(concatenate(self.tree(), other.tree()))
+
+    def __len__(self):
+        if self.values is not None:
+            return len(self.values)
+        return self.root.size
+
+    def __getitem__(self, index):
+        if self.values is not None:
+            if isinstance(index, slice):
+                if index.step not in (None, 1):
+                    raise ValueError("ConcatenableQueue slices must have step 1")
+                return ConcatenableQueue.from_values(self.values[index])
+            return self.values[index]
+
+        length = self.root.size
+
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                raise ValueError("ConcatenableQueue slices must have step 1")
+
+            if start >= stop:
+                return EMPTY_QUEUE
+
+            root = self.root
+            if stop < length:
+                root, _ = split(root, stop)
+            if start > 0:
+                _, root = split(root, start)
+            return ConcatenableQueue.from_root(root)
+
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("ConcatenableQueue index out of range")
+
+        node = self.root
+        while True:
+            left_size = node.left.size if node.left is not None else 0
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.value
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def window(self, index):
+        # value at index together with its neighbours, None past either end
+        if self.values is not None:
+            values = self.values
+            return values[index - 1] if index > 0 else None, values[index], \
+                values[index + 1] if index + 1 < len(values) else None
+
+        node = self.root
+        predecessor = None
+        successor = None
+
+        while True:
+            left_size = node.left.size if node.left is not None else 0
+            if index < left_size:
+                successor = node
+                node = node.left
+            elif index > left_size:
+                predecessor = node
+                index -= left_size + 1
+                node = node.right
+            else:
+                break
+
+        if node.left is not None:
+            predecessor = node.left
+            while predecessor.right is not None:
+                predecessor = predecessor.right
+
+        if node.right is not None:
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+
+        return predecessor.value if predecessor is not None else None, node.value, \
+            successor.value if successor is not None else None
+
+    def bisect(self, predicate):
+        # index of the first value for which predicate(value, successor) holds, the successor of the last
+        # value is None; predicate must be false up to some index and true from there on, len(self) if never true
+        if self.values is not None:
+            values = self.values
+            lo, hi = 0, len(values)
+            while lo < hi:
+                middle = (lo + hi) // 2
+                if predicate(values[middle], values[middle + 1] if middle + 1 < len(values) else None):
+                    hi = middle
+                else:
+                    lo = middle + 1
+            return lo
+
+        node = self.root
+        successor = None
+        index = 0
+        found = node.size
+
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if predicate(node.value, node.right.first if node.right is not None else successor):
+                found = index + left_size
+                successor = node.value
+                node = node.left
+            else:
+                index += left_size + 1
+                node = node.right
+
+        return found
+
+    def __iter__(self):
+        if self.values is not None:
+            return iter(self.values)
+        return iterate(self.root)
+
+    def __repr__(self):
+        return str(list(self))
+
+
+# queues are never modified, so every empty one can be the same object
+EMPTY_QUEUE = ConcatenableQueue()
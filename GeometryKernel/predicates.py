@@ -0,0 +1,92 @@
+import math
+
+# Float filters after Shewchuk: when the float result is larger than the bound its sign is right,
+# otherwise the same expression is evaluated again exactly. Every float is an integer over a power
+# of two, so after scaling all coordinates by the largest of those powers the exact evaluation runs
+# on Python integers; the predicates are homogeneous, scaling does not change their signs.
+EPSILON = 2.0 ** -53
+ORIENTATION_ERROR = (3.0 + 16.0 * EPSILON) * EPSILON
+# The filters compare squares, which needs no abs(): |a| + |b| is the larger of |a - b| and |a + b|,
+# and (|a| + |b|)^2 <= 2 (a^2 + b^2). The squares are rounded too, hence the extra margin.
+ORIENTATION_ERROR_SQUARED = (ORIENTATION_ERROR * (1.0 + 8.0 * EPSILON)) ** 2
+# the intersection test is a polynomial of degree three in the coordinate differences, the factor 4
+# covers the two (|a| + |b|)^2 <= 2 (a^2 + b^2) steps of its bound
+INTERSECTION_ERROR_SQUARED = 4.0 * (16.0 * EPSILON) ** 2
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def scaled_integers(*values):
+    ratios = [float(value).as_integer_ratio() for value in values]
+    scale = max(denominator for _, denominator in ratios)
+    return [numerator * (scale // denominator) for numerator, denominator in ratios]
+
+
+def exact_orientation(ax, ay, bx, by, cx, cy):
+    ax, ay, bx, by, cx, cy = scaled_integers(ax, ay, bx, by, cx, cy)
+    return sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+
+def orientation(ax, ay, bx, by, cx, cy):
+    # 1 if a -> b -> c turns left, -1 if it turns right, 0 if the points are collinear
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    determinant, total = left - right, left + right
+
+    if determinant * determinant > ORIENTATION_ERROR_SQUARED * total * total:
+        return 1 if determinant > 0 else -1
+    return exact_orientation(ax, ay, bx, by, cx, cy)
+
+
+# Semi-static filters for points whose coordinates are all at most magnitude in absolute value:
+# |left| + |right| of orientation() is then at most 8 magnitude^2, so a float determinant beyond
+# ORIENTATION_FILTER * magnitude^2 has the right sign whatever the points were. The factor 2 covers the
+# rounding of the bound itself. Callers inline the test and pass what it cannot decide to orientation().
+ORIENTATION_FILTER = 2.0 * ORIENTATION_ERROR * 8.0
+
+
+def filter_bounds(magnitude):
+    # The semi-static orientation bound and the one for intersection_side(), whose terms are at most
+    # 16 magnitude^3. Returns low, high for orientations and low, high for intersection offsets.
+    orientation_high = ORIENTATION_FILTER * magnitude * magnitude
+    intersection_high = 2.0 * 16.0 * EPSILON * 32.0 * magnitude * magnitude * magnitude
+    return -orientation_high, orientation_high, -intersection_high, intersection_high
+
+
+# bounds that decide nothing, every value goes through the adaptive predicates
+NO_BOUNDS = filter_bounds(math.inf)
+
+
+def exact_intersection_side(ax, ay, bx, by, cx, cy, dx, dy, mx, my):
+    ax, ay, bx, by, cx, cy, dx, dy, mx, my = scaled_integers(ax, ay, bx, by, cx, cy, dx, dy, mx, my)
+    ux, uy, vx, vy, wx, wy = bx - ax, by - ay, dx - cx, dy - cy, cx - ax, cy - ay
+
+    denominator = ux * vy - uy * vx
+    numerator = wx * vy - wy * vx
+    side_x = sign((ax - mx) * denominator + ux * numerator) * sign(denominator)
+    if side_x:
+        return side_x
+    return sign((ay - my) * denominator + uy * numerator) * sign(denominator)
+
+
+def intersection_side(ax, ay, bx, by, cx, cy, dx, dy, mx, my):
+    # Compares the crossing point of the lines ab and cd with m, x first and y on a tie:
+    # 1 if it comes after m, -1 if before, 0 if it is m. The lines must not be parallel.
+    # The crossing is a + t (b - a) with t = cross(c - a, d - c) / cross(b - a, d - c); multiplying
+    # through by the denominator keeps the test free of division.
+    ux, vx, vy = bx - ax, dx - cx, dy - cy
+    uy_vx, ux_vy = (by - ay) * vx, ux * vy
+    wx_vy, wy_vx = (cx - ax) * vy, (cy - ay) * vx
+    denominator, total = ux_vy - uy_vx, ux_vy + uy_vx
+    shift = ax - mx
+    offset = shift * denominator + ux * (wx_vy - wy_vx)
+    magnitude = shift * shift * (ux_vy * ux_vy + uy_vx * uy_vx) + ux * ux * (wx_vy * wx_vy + wy_vx * wy_vx)
+
+    if denominator * denominator > ORIENTATION_ERROR_SQUARED * total * total and \
+            offset * offset > INTERSECTION_ERROR_SQUARED * magnitude:
+        return 1 if (offset > 0) == (denominator > 0) else -1
+
+    # the x coordinates are too close to call or equal
+    return exact_intersection_side(ax, ay, bx, by, cx, cy, dx, dy, mx, my)
@@ -0,0 +1,114 @@
+import random
+from fractions import Fraction
+
+import numpy
+import pytest
+
+from GeometryKernel.predicates import ORIENTATION_FILTER, filter_bounds, intersection_side, orientation
+from GeometryKernel.vectorized import intersection_sides, orientations
+
+# Exact references in Fractions: every float is a rational, so these are the true signs. The float filters
+# and the semi-static bounds are compared with them on random points and on near-collinear ones, where
+# the float signs are noise, at scales from 1e-8 to 1e8.
+
+SCALES = [10.0 ** exponent for exponent in range(-8, 9, 2)]
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def fraction_orientation(ax, ay, bx, by, cx, cy):
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+
+def fraction_intersection_side(ax, ay, bx, by, cx, cy, dx, dy, mx, my):
+    ax, ay, bx, by, cx, cy, dx, dy, mx, my = map(Fraction, (ax, ay, bx, by, cx, cy, dx, dy, mx, my))
+    ux, uy, vx, vy = bx - ax, by - ay, dx - cx, dy - cy
+    t = ((cx - ax) * vy - (cy - ay) * vx) / (ux * vy - uy * vx)
+    x, y = ax + t * ux, ay + t * uy
+    return sign(x - mx) or sign(y - my)
+
+
+def near_collinear_triples(n, scale, seed):
+    # three points of a line rounded to floats, some of them exactly collinear, some on an axis
+    rng = random.Random(seed)
+    triples = []
+    for k in range(n):
+        slope, shift = rng.uniform(-2, 2), rng.uniform(-1, 1)
+        xs = [rng.uniform(-1, 1) for _ in range(3)]
+        if k % 5 == 0:
+            slope, xs = 0.5, [0.25, -0.5, 0.75]
+        elif k % 7 == 0:
+            slope = 0.0
+        triples.append(tuple(value * scale for x in xs for value in (x, slope * x + shift)))
+    return triples
+
+
+def random_triples(n, scale, seed):
+    rng = random.Random(seed)
+    return [tuple(rng.uniform(-scale, scale) for _ in range(6)) for _ in range(n)]
+
+
+def near_concurrent_lines(n, scale, seed):
+    # two lines through a common point m, every point rounded to floats, so the crossing is within rounding of m
+    rng = random.Random(seed)
+    arguments = []
+    while len(arguments) < n:
+        mx, my = rng.uniform(-1, 1), rng.uniform(-1, 1)
+        ux, uy, vx, vy, a, b, c, d = (rng.uniform(-1, 1) for _ in range(8))
+        argument = tuple(value * scale for value in (mx + a * ux, my + a * uy, mx + b * ux, my + b * uy,
+                                                     mx + c * vx, my + c * vy, mx + d * vx, my + d * vy, mx, my))
+        ax, ay, bx, by, cx, cy, dx, dy = map(Fraction, argument[:8])
+        # the rounded lines must not be parallel
+        if (bx - ax) * (dy - cy) != (by - ay) * (dx - cx):
+            arguments.append(argument)
+    return arguments
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_orientation_matches_fractions(scale):
+    for triples in (near_collinear_triples(300, scale, 0), random_triples(300, scale, 1)):
+        for triple in triples:
+            assert orientation(*triple) == fraction_orientation(*triple)
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_semi_static_filter(scale):
+    # a float turn beyond the bound of the largest coordinate has the exact sign, as the callers assume
+    for triple in near_collinear_triples(300, scale, 2) + random_triples(300, scale, 3):
+        magnitude = max(map(abs, triple))
+        low, high, _, _ = filter_bounds(magnitude)
+        assert high == ORIENTATION_FILTER * magnitude * magnitude
+        ax, ay, bx, by, cx, cy = triple
+        determinant = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        if determinant > high:
+            assert fraction_orientation(*triple) == 1
+        elif determinant < low:
+            assert fraction_orientation(*triple) == -1
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_intersection_side_matches_fractions(scale):
+    rng = random.Random(4)
+    arguments = near_concurrent_lines(200, scale, 5)
+    arguments += [arguments[k][:8] + (rng.uniform(-scale, scale), rng.uniform(-scale, scale)) for k in range(50)]
+    for argument in arguments:
+        assert intersection_side(*argument) == fraction_intersection_side(*argument)
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_vectorized_match_scalar(scale):
+    triples = numpy.array(near_collinear_triples(300, scale, 6) + random_triples(300, scale, 7))
+    turns = orientations(*triples.T)
+    assert turns.tolist() == [fraction_orientation(*triple) for triple in triples.tolist()]
+
+    # entries masked out are left as their float signs, the others are exact
+    used = numpy.arange(len(triples)) % 2 == 0
+    masked = orientations(*triples.T, used=used)
+    assert numpy.array_equal(masked[used], turns[used])
+
+    arguments = numpy.array(near_concurrent_lines(200, scale, 8))
+    sides = intersection_sides(*arguments.T)
+    assert sides.tolist() == [fraction_intersection_side(*argument) for argument in arguments.tolist()]
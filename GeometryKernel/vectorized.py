@@ -0,0 +1,39 @@
+import numpy as np
+
+from GeometryKernel.predicates import INTERSECTION_ERROR_SQUARED, ORIENTATION_ERROR_SQUARED, \
+    exact_intersection_side, exact_orientation
+
+# The predicates of GeometryKernel.predicates over arrays: the float filters run on whole arrays, the few
+# entries they cannot decide are evaluated exactly one by one. used masks out entries whose result is
+# thrown away anyway, they are never evaluated exactly.
+
+
+def orientations(x1, y1, x2, y2, x3, y3, used=True):
+    left = (x2 - x1) * (y3 - y1)
+    right = (y2 - y1) * (x3 - x1)
+    turns, total = left - right, left + right
+
+    undecided = np.flatnonzero(used & (turns * turns <= ORIENTATION_ERROR_SQUARED * total * total))
+    turns = np.sign(turns)
+    for i in undecided.tolist():
+        turns[i] = exact_orientation(x1[i], y1[i], x2[i], y2[i], x3[i], y3[i])
+
+    return turns
+
+
+def intersection_sides(ax, ay, bx, by, cx, cy, dx, dy, mx, my, used=True):
+    ux, vx, vy = bx - ax, dx - cx, dy - cy
+    uy_vx, ux_vy = (by - ay) * vx, ux * vy
+    wx_vy, wy_vx = (cx - ax) * vy, (cy - ay) * vx
+    denominator, total = ux_vy - uy_vx, ux_vy + uy_vx
+    shift = ax - mx
+    offset = shift * denominator + ux * (wx_vy - wy_vx)
+    magnitude = shift * shift * (ux_vy * ux_vy + uy_vx * uy_vx) + ux * ux * (wx_vy * wx_vy + wy_vx * wy_vx)
+
+    sides = np.sign(offset) * np.sign(denominator)
+    undecided = np.flatnonzero(used & ((denominator * denominator <= ORIENTATION_ERROR_SQUARED * total * total) |
+                                       (offset * offset <= INTERSECTION_ERROR_SQUARED * magnitude)))
+    for i in undecided.tolist():
+        sides[i] = exact_intersection_side(ax[i], ay[i], bx[i], by[i], cx[i], cy[i], dx[i], dy[i], mx[i], my[i])
+
+    return sides
@@ -0,0 +1,277 @@
+from functools import cmp_to_key
+
+import numpy
+
+from GeometryKernel.predicates import orientation
+from GeometryKernel.vectorized import orientations
+from Lab1_PointLocalization_Chains.file_utils import read_graph_arrays
+
+
+def adjacency_order(x, y, tails, heads, is_out):
+    # Order of the edge ends (tail, head) that groups them by tail, the in list (is_out False) before the out
+    # list, each one in the order of the old per vertex sort by atan2: out lists by decreasing angle, in lists
+    # by increasing angle with a horizontal edge from the left last. Ends in the same direction keep their
+    # order in out lists and are reversed in in lists.
+    #
+    # One lexsort on a pseudo-angle, dx / (|dx| + |dy|), that grows with the angle on each half plane; being
+    # rounded it may tie or swap nearly parallel edges, so neighbouring ends are checked with the exact
+    # orientation afterwards and the few lists where that fails are sorted again by it.
+    positions = numpy.arange(len(tails))
+    ties = numpy.where(is_out, positions, -positions)
+    dx, dy = x[heads] - x[tails], y[heads] - y[tails]
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        pseudo_angles = dx / (numpy.abs(dx) + numpy.abs(dy))
+    from_left = ~is_out & (dy == 0)
+    pseudo_angles[from_left] = 2.0
+
+    order = numpy.lexsort((ties, pseudo_angles, is_out, tails))
+
+    a, b = order[:-1], order[1:]
+    same_list = (tails[a] == tails[b]) & (is_out[a] == is_out[b])
+    checked = same_list & ~from_left[a] & ~from_left[b]
+    turns = orientations(x[tails[a]], y[tails[a]], x[heads[a]], y[heads[a]], x[heads[b]], y[heads[b]], checked)
+    turns = numpy.where(is_out[a], -turns, turns)
+    wrong = checked & ((turns < 0) | ((turns == 0) & (ties[a] > ties[b])))
+
+    if wrong.any():
+        x_list, y_list = x.tolist(), y.tolist()
+        tail_list, head_list = tails.tolist(), heads.tolist()
+        out_list, tie_list, left_list = is_out.tolist(), ties.tolist(), from_left.tolist()
+
+        def compare(first, second):
+            if left_list[first] != left_list[second]:
+                return left_list[first] - left_list[second]
+            tail, head_1, head_2 = tail_list[first], head_list[first], head_list[second]
+            turn = orientation(x_list[tail], y_list[tail], x_list[head_1], y_list[head_1], x_list[head_2],
+                               y_list[head_2])
+            if turn:
+                return turn if out_list[first] else -turn
+            return tie_list[first] - tie_list[second]
+
+        starts = numpy.flatnonzero(numpy.concatenate(([True], ~same_list, [True])))
+        for list_number in numpy.unique(numpy.searchsorted(starts, numpy.flatnonzero(wrong), side="right") - 1):
+            start, stop = starts[list_number], starts[list_number + 1]
+            order[start:stop] = sorted(order[start:stop].tolist(), key=cmp_to_key(compare))
+
+    return order
+
+
+class ArrayGraph:
+    # Graph with its vertices and edges in flat arrays instead of Vertex objects, for subdivisions too large
+    # for one object and a few lists per vertex. After prepare() the vertices are numbered as
+    # Graph.sort_vertices numbers them and the adjacency is in CSR form: the neighbours of vertex v are
+    # neighbours[offsets[v]:offsets[v + 1]], its in list (Vertex.in_list) first and from out_starts[v] on
+    # its out list (Vertex.out_list), both in the order Vertex.create_in_out_lists gives them. edge_ids
+    # runs along neighbours. find_chains and chain_edges give the chains Graph gives.
+    def __init__(self, vertices, edges):
+        vertices = numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 2)
+        self.x = numpy.ascontiguousarray(vertices[:, 0])
+        self.y = numpy.ascontiguousarray(vertices[:, 1])
+        self.edges = numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2)
+
+        self.offsets = None
+        self.out_starts = None
+        self.neighbours = None
+        self.edge_ids = None
+        self.weights = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def prepare(self):
+        # numbers the vertices bottom to top and builds the in and out lists of all of them at once; returns
+        # the new number of every vertex by its old one
+        order = numpy.lexsort((self.x, self.y))
+        numbers = numpy.empty_like(order)
+        numbers[order] = numpy.arange(len(order))
+        self.x, self.y = self.x[order], self.y[order]
+        self.edges = numbers[self.edges]
+
+        # both ends of every edge in edge order, the order Graph.add_edge appends neighbours in
+        tails = self.edges.reshape(-1)
+        heads = self.edges[:, ::-1].reshape(-1)
+        is_out = heads > tails
+        order = adjacency_order(self.x, self.y, tails, heads, is_out)
+
+        self.neighbours = heads[order]
+        self.edge_ids = order // 2
+        self.offsets = numpy.searchsorted(tails[order], numpy.arange(len(self) + 1))
+        self.out_starts = self.offsets[:-1] + numpy.bincount(tails[~is_out], minlength=len(self))
+        return numbers
+
+    def extended(self, vertices, edges):
+        # A prepared copy of this prepared graph with (k, 2) vertices and (m, 2) edges added, the new vertices
+        # numbered len(self) + i in edges, and the new number of every vertex by its old one. The lists of the
+        # vertices without a new edge keep their order, only those of the others are sorted again; weights
+        # are left to the caller.
+        vertices = numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 2)
+        edges = numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2)
+
+        grown = ArrayGraph(numpy.concatenate((numpy.column_stack((self.x, self.y)), vertices)), self.edges)
+        order = numpy.lexsort((grown.x, grown.y))
+        numbers = numpy.empty_like(order)
+        numbers[order] = numpy.arange(len(order))
+        grown.x, grown.y = grown.x[order], grown.y[order]
+        grown.edges = numbers[numpy.concatenate((self.edges, edges))]
+
+        touched = numpy.zeros(len(grown), dtype=bool)
+        touched[grown.edges[len(self.edges):]] = True
+
+        # the slots of untouched vertices as they are, renumbered; the stable sort of the vertices kept the
+        # old ones in order, so these are still grouped and ordered by vertex
+        slot_vertices = numbers[numpy.repeat(numpy.arange(len(self)), numpy.diff(self.offsets))]
+        kept = numpy.flatnonzero(~touched[slot_vertices])
+
+        # the ends at touched vertices sorted anew, in edge order as prepare takes them
+        tails = grown.edges.reshape(-1)
+        heads = grown.edges[:, ::-1].reshape(-1)
+        ends = numpy.flatnonzero(touched[tails])
+        is_out = heads[ends] > tails[ends]
+        sorted_ends = ends[adjacency_order(grown.x, grown.y, tails[ends], heads[ends], is_out)]
+
+        # two runs ordered by vertex, merged by a stable sort
+        slot_tails = numpy.concatenate((slot_vertices[kept], tails[sorted_ends]))
+        merge = numpy.argsort(slot_tails, kind="stable")
+        grown.neighbours = numpy.concatenate((numbers[self.neighbours[kept]], heads[sorted_ends]))[merge]
+        grown.edge_ids = numpy.concatenate((self.edge_ids[kept], sorted_ends // 2))[merge]
+        grown.offsets = numpy.searchsorted(slot_tails[merge], numpy.arange(len(grown) + 1))
+        grown.out_starts = grown.offsets[:-1] + numpy.bincount(tails[heads < tails], minlength=len(grown))
+        return grown, numbers
+
+    def balance_algorithm(self):
+        # Graph.balance_algorithm on the arrays
+        self.prepare()
+
+        offsets, out_starts = self.offsets.tolist(), self.out_starts.tolist()
+        neighbours, edge_ids = self.neighbours.tolist(), self.edge_ids.tolist()
+        weights = [1] * len(self.edges)
+
+        w_in = (self.out_starts - self.offsets[:-1]).tolist()
+        w_out = (self.offsets[1:] - self.out_starts).tolist()
+
+        for index in range(1, len(self) - 1):
+            if w_in[index] > w_out[index]:
+                difference = w_in[index] - w_out[index]
+                leftest = out_starts[index]
+                weights[edge_ids[leftest]] += difference
+                w_out[index] += difference
+                w_in[neighbours[leftest]] += difference
+
+        for index in range(len(self) - 1, 0, -1):
+            if w_out[index] > w_in[index]:
+                difference = w_out[index] - w_in[index]
+                leftest = offsets[index]
+                weights[edge_ids[leftest]] += difference
+                w_in[index] += difference
+                w_out[neighbours[leftest]] += difference
+
+        self.weights = numpy.array(weights, dtype=numpy.int64)
+
+    def rebalance(self):
+        # After edges were added with weight 1 to a prepared graph: restores in weight == out weight at every
+        # vertex but the lowest and the highest by pushing the difference of each along its left most path up
+        # to the top or down to the bottom. The vertices on a path stay balanced and only its edges change,
+        # the weights stay >= 1, so the chains are those of a valid decomposition again; another one than
+        # balance_algorithm would find.
+        in_counts = self.out_starts - self.offsets[:-1]
+        out_counts = self.offsets[1:] - self.out_starts
+        stuck = numpy.flatnonzero(numpy.concatenate(([False], in_counts[1:-1] == 0, [False])) |
+                                  numpy.concatenate(([False], out_counts[1:-1] == 0, [False])))
+        if len(stuck):
+            raise ValueError(f"vertices {stuck[:10].tolist()} have no edge below or above them")
+
+        lower, upper = self.edges.min(axis=1), self.edges.max(axis=1)
+        excess = numpy.bincount(upper, self.weights, len(self)) - numpy.bincount(lower, self.weights, len(self))
+        excess[[0, -1]] = 0
+
+        out_starts, offsets = self.out_starts.tolist(), self.offsets.tolist()
+        neighbours, edge_ids = self.neighbours.tolist(), self.edge_ids.tolist()
+        weights = self.weights.tolist()
+        last_vertex = len(self) - 1
+
+        for vertex, difference in zip(numpy.flatnonzero(excess).tolist(), excess[excess != 0].astype(int).tolist()):
+            # more in than out goes up along left most out edges, more out than in comes from below along left
+            # most in edges
+            while vertex not in (0, last_vertex):
+                k = out_starts[vertex] if difference > 0 else offsets[vertex]
+                weights[edge_ids[k]] += abs(difference)
+                vertex = neighbours[k]
+
+        self.weights = numpy.array(weights, dtype=numpy.int64)
+
+    def chains_count(self):
+        # the weight leaving the lowest vertex
+        return int(self.weights[self.edge_ids[self.out_starts[0]:self.offsets[1]]].sum()) if len(self) else 0
+
+    def find_chains(self):
+        # the chains of Graph.find_chains as arrays of vertex numbers, with the weights there are if any
+        if self.weights is None:
+            self.balance_algorithm()
+
+        out_starts, offsets = self.out_starts.tolist(), self.offsets.tolist()
+        neighbours, edge_ids = self.neighbours.tolist(), self.edge_ids.tolist()
+        weights = self.weights.tolist()
+
+        # position of the left most out edge of every vertex that some chain still has to take
+        cursors = list(out_starts)
+        last_vertex = len(self) - 1
+
+        chains = []
+        for _ in range(self.chains_count()):
+            chain = []
+            current_vertex = 0
+            while current_vertex != last_vertex:
+                chain.append(current_vertex)
+                k = cursors[current_vertex]
+                edge = edge_ids[k]
+
+                weights[edge] -= 1
+                if weights[edge] == 0:
+                    cursors[current_vertex] = k + 1
+                current_vertex = neighbours[k]
+
+            chain.append(last_vertex)
+            chains.append(numpy.array(chain, dtype=numpy.int64))
+
+        return chains
+
+    def chain_edge_arrays(self):
+        # Graph.chain_edges as arrays: lower and upper vertex, first and last chain of every edge, with the
+        # weights there are if any
+        if self.weights is None:
+            self.balance_algorithm()
+
+        # the place of every edge among the chains leaving its lower vertex: the weight of the out edges before
+        # it in the out list, one running sum over all out lists less the sum where its list starts
+        slot_vertices = numpy.repeat(numpy.arange(len(self)), numpy.diff(self.offsets))
+        out_slots = numpy.flatnonzero(numpy.arange(len(self.edge_ids)) >= self.out_starts[slot_vertices])
+        out_weights = numpy.zeros(len(self.edge_ids) + 1, dtype=numpy.int64)
+        out_weights[out_slots + 1] = self.weights[self.edge_ids[out_slots]]
+        before = numpy.cumsum(out_weights)
+        places = numpy.zeros(len(self.edges), dtype=numpy.int64)
+        places[self.edge_ids[out_slots]] = before[out_slots] - before[self.out_starts[slot_vertices[out_slots]]]
+
+        out_starts, offsets = self.out_starts.tolist(), self.offsets.tolist()
+        neighbours, edge_ids, edge_places = self.neighbours.tolist(), self.edge_ids.tolist(), places.tolist()
+
+        # the chains through a vertex start at the lowest first chain of its in edges, which is that of in
+        # list[0] or of a horizontal edge from the left, the last one there
+        chains = [0] * len(self)
+        for vertex in range(1, len(self)):
+            if offsets[vertex] < out_starts[vertex]:
+                k, last = offsets[vertex], out_starts[vertex] - 1
+                chains[vertex] = min(chains[neighbours[k]] + edge_places[edge_ids[k]],
+                                     chains[neighbours[last]] + edge_places[edge_ids[last]])
+
+        lower = self.edges.min(axis=1)
+        first = numpy.array(chains, dtype=numpy.int64)[lower] + places
+        return lower, self.edges.max(axis=1), first, first + self.weights - 1
+
+    def coordinates(self):
+        return self.x, self.y
+
+
+def array_graph_from_file(path, cache=False):
+    # the graph and the query point (an array, None if the file has none) of a graph file
+    vertices, edges, query = read_graph_arrays(path, cache)
+    return ArrayGraph(vertices, edges), query
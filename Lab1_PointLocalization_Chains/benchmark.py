@@ -0,0 +1,165 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import matplotlib.tri as mtri
+import numpy
+
+from Lab1_PointLocalization_Chains.array_graph import ArrayGraph
+from Lab1_PointLocalization_Chains.chain_index import ChainIndex
+from Lab1_PointLocalization_Chains.chain_tree import ChainTree
+from Lab1_PointLocalization_Chains.location_cache import LocationCache
+from Lab1_PointLocalization_Chains.main import Graph, Vertex, graph_from_arrays
+from Lab1_PointLocalization_Chains.slab_tree import SlabTree
+
+
+def triangulation_graph(n):
+    # Delaunay triangulation of n random points in the unit square: every vertex but the lowest has a
+    # neighbour below and every vertex but the highest one above, as the chain method needs
+    xs = [random.random() for _ in range(n)]
+    ys = [random.random() for _ in range(n)]
+
+    graph = Graph()
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        graph.add_vertex(Vertex(x, y, i))
+    for first, second in mtri.Triangulation(xs, ys).edges.tolist():
+        graph.add_edge(first, second)
+
+    return graph
+
+
+def location_benchmark(n, queries=10 ** 5):
+    graph = triangulation_graph(n)
+
+    start = time.perf_counter()
+    chains = graph.find_chains()
+    chains_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ChainIndex(chains)
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree = ChainTree(graph)
+    tree_time = time.perf_counter() - start
+
+    points = numpy.column_stack((numpy.random.uniform(0, 1, queries),
+                                 numpy.random.uniform(index.y_list[0], index.y_list[-1], queries)))
+
+    start = time.perf_counter()
+    for x, y in points.tolist():
+        index.locate(x, y)
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.locate_many(points)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for x, y in points.tolist():
+        tree.locate(x, y)
+    tree_single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tree.locate_many(points)
+    tree_batch_time = time.perf_counter() - start
+
+    print(f"location: n = {n}, {len(chains)} chains found in {chains_time:.3f} s, indexed in {index_time:.3f} s, "
+          f"chain tree built in {tree_time:.3f} s")
+    print(f"  stored: chains {len(index.x)} vertices, chain tree {len(tree.first)} edges")
+    print(f"  {queries} queries: ChainIndex locate {single_time / queries * 1e6:.2f} us per point, "
+          f"locate_many {batch_time / queries * 1e6:.2f} us per point")
+    print(f"  {queries} queries: ChainTree locate {tree_single_time / queries * 1e6:.2f} us per point, "
+          f"locate_many {tree_batch_time / queries * 1e6:.2f} us per point")
+
+
+def triangulation_arrays(n):
+    xs = numpy.random.random(n)
+    ys = numpy.random.random(n)
+    return numpy.column_stack((xs, ys)), mtri.Triangulation(xs, ys).edges.astype(numpy.int64)
+
+
+def memory_benchmark(n):
+    vertices, edges = triangulation_arrays(n)
+
+    for name, build in (("Graph", graph_from_arrays), ("ArrayGraph", ArrayGraph)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        graph = build(vertices, edges)
+        ChainTree(graph)
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name:>10}: n = {n}, {len(edges)} edges, chain tree in {elapsed:.2f} s, "
+              f"graph {current / n:.0f} B per vertex, peak {peak / n:.0f} B per vertex")
+        del graph
+
+
+def locator_benchmark(n, queries=10 ** 5):
+    # build time, stored size and query throughput of every Locator over the same graph
+    vertices, edges = triangulation_arrays(n)
+    graph = ArrayGraph(vertices, edges)
+    points = numpy.random.random((queries, 2))
+
+    locations = []
+    for locator_type in (ChainTree, SlabTree):
+        start = time.perf_counter()
+        locator = locator_type(graph)
+        build_time = time.perf_counter() - start
+        size = sum(getattr(locator, name).nbytes for name in locator.FIELDS)
+        # the first single query makes the lists the others read
+        locator.locate(0.5, 0.5)
+
+        start = time.perf_counter()
+        for x, y in points.tolist():
+            locator.locate(x, y)
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        locations.append(locator.locate_many(points))
+        batch_time = time.perf_counter() - start
+
+        print(f"{locator_type.__name__:>10}: n = {n}, built in {build_time:.2f} s, {size / 2 ** 20:.1f} MiB, "
+              f"locate {single_time / queries * 1e6:.2f} us, locate_many {batch_time / queries * 1e6:.2f} us "
+              f"per point")
+
+    print(f"  same locations: {all(numpy.array_equal(locations[0], other) for other in locations[1:])}")
+
+
+def cache_benchmark(n, queries=10 ** 5, distinct=10 ** 4, exponent=1.1):
+    # LocationCache over a ChainTree on a skewed trace: distinct points queried with Zipf frequencies, the
+    # k-th most frequent one in proportion to k ** -exponent, for several capacities
+    vertices, edges = triangulation_arrays(n)
+    tree = ChainTree(ArrayGraph(vertices, edges))
+    tree.locate(0.5, 0.5)
+
+    ranks = numpy.arange(1, distinct + 1, dtype=numpy.float64)
+    frequencies = ranks ** -exponent
+    sites = numpy.random.random((distinct, 2))
+    trace = sites[numpy.random.choice(distinct, queries, p=frequencies / frequencies.sum())].tolist()
+
+    start = time.perf_counter()
+    expected = [tree.locate(x, y) for x, y in trace]
+    plain_time = time.perf_counter() - start
+    print(f"  uncached: n = {n}, {queries} queries of {distinct} points, {plain_time / queries * 1e6:.2f} us per query")
+
+    for capacity in (distinct // 100, distinct // 10, distinct):
+        cache = LocationCache(tree, capacity)
+        start = time.perf_counter()
+        locations = [cache.locate(x, y) for x, y in trace]
+        cached_time = time.perf_counter() - start
+
+        print(f"  capacity {capacity:>6}: hit rate {cache.hits / queries:.1%}, "
+              f"{cached_time / queries * 1e6:.2f} us per query, same locations: {locations == expected}")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    numpy.random.seed(0)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    location_benchmark(size)
+    memory_benchmark(size * 100)
+    locator_benchmark(size * 10)
+    cache_benchmark(size * 10)
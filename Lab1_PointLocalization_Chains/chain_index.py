@@ -0,0 +1,132 @@
+from bisect import bisect_left, bisect_right
+
+import numpy
+
+from GeometryKernel.predicates import ORIENTATION_FILTER, orientation
+from GeometryKernel.vectorized import orientations
+
+
+class ChainIndex:
+    # The separating chains of a monotone subdivision, built once and queried many times. The chains run
+    # from the lowest vertex to the highest and are ordered left to right, as Graph.find_chains returns them.
+    # Their coordinates are kept end to end in flat arrays, chain i is x[starts[i]:starts[i + 1]] and
+    # y[starts[i]:starts[i + 1]], so a query is two nested binary searches on indices: O(log^2 n), no slicing.
+    # The chains are lists of vertices, or with x and y given arrays of vertex numbers into those coordinate
+    # arrays, as ArrayGraph.find_chains returns them.
+    #
+    # The edge of a chain at height y is the one it leaves that height along upwards, at the top, where no
+    # chain goes on, the one it arrives along: a horizontal edge never counts, so the side of a point is
+    # monotone over the chains on the top row as well. Every locator follows this rule.
+    def __init__(self, chains, x=None, y=None):
+        self.chains = chains
+        self.count = len(chains)
+
+        lengths = numpy.fromiter(map(len, chains), dtype=numpy.int64, count=len(chains))
+        self.starts = numpy.zeros(len(chains) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=self.starts[1:])
+
+        total = int(self.starts[-1])
+        if x is not None:
+            numbers = numpy.concatenate(chains) if chains else numpy.empty(0, dtype=numpy.int64)
+            self.x, self.y = x[numbers], y[numbers]
+        else:
+            self.x = numpy.fromiter((vertex.x for chain in chains for vertex in chain), dtype=numpy.float64,
+                                    count=total)
+            self.y = numpy.fromiter((vertex.y for chain in chains for vertex in chain), dtype=numpy.float64,
+                                    count=total)
+
+        # single queries read Python lists, bisect on those is about three times faster than searchsorted
+        self.x_list = self.x.tolist()
+        self.y_list = self.y.tolist()
+        self.start_list = self.starts.tolist()
+        # the largest absolute coordinate, for the semi-static orientation filter of the single queries
+        self.magnitude = max(float(abs(self.x).max()), float(abs(self.y).max())) if total else 0.0
+
+        # Batched queries search all chains with one searchsorted: every vertex gets the key
+        # chain * stride + rank of its y among all distinct ys, which sorts the flat arrays by (chain, y).
+        self.distinct_y = numpy.unique(self.y)
+        self.stride = len(self.distinct_y) + 1
+        chain_numbers = numpy.repeat(numpy.arange(len(chains), dtype=numpy.int64), lengths)
+        self.keys = chain_numbers * self.stride + numpy.searchsorted(self.distinct_y, self.y, side="right")
+
+    def segment(self, chain, y):
+        # index of the lower end of the edge of chain at y, the end edges are extended
+        start, stop = self.start_list[chain], self.start_list[chain + 1]
+        if y >= self.y_list[stop - 1]:
+            return bisect_left(self.y_list, y, start + 1, stop - 1) - 1
+        return bisect_right(self.y_list, y, start + 1, stop - 1) - 1
+
+    def filter_bound(self, x, y):
+        # float turns beyond it decide a test against (x, y), the others go to the adaptive predicate
+        magnitude = max(self.magnitude, abs(x), abs(y))
+        return ORIENTATION_FILTER * magnitude * magnitude
+
+    def is_left_of(self, chain, x, y, high=None):
+        # True if (x, y) lies left of chain or on it; high is filter_bound(x, y), for several tests of a point
+        if high is None:
+            high = self.filter_bound(x, y)
+        lower = self.segment(chain, y)
+        ax, ay, bx, by = self.x_list[lower], self.y_list[lower], self.x_list[lower + 1], self.y_list[lower + 1]
+        determinant = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+        return determinant > high or (determinant >= -high and orientation(ax, ay, bx, by, x, y) >= 0)
+
+    def locate(self, x, y):
+        # (left, right): indices of the chains the point lies between, None past the outer chains.
+        # A point left of a chain is left of every chain after it, so the first such chain is found by bisection.
+        # All chains share their end points; above or below those the extended end edges may cross, such a
+        # point lies outside the subdivision and gets (None, None).
+        if not self.count or not self.y_list[0] <= y <= self.y_list[-1]:
+            return None, None
+
+        high = self.filter_bound(x, y)
+        lo, hi = 0, self.count
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if self.is_left_of(middle, x, y, high):
+                hi = middle
+            else:
+                lo = middle + 1
+
+        return lo - 1 if lo > 0 else None, lo if lo < self.count else None
+
+    def locate_chains(self, point):
+        # the chains themselves, in the [left, right] form of point_localization
+        left, right = self.locate(point.x, point.y)
+        return [self.chains[left] if left is not None else None, self.chains[right] if right is not None else None]
+
+    def locate_many(self, points):
+        # locate for an (n, 2) array of points at once, as an (n, 2) array of chain indices with -1 for None.
+        # Every point runs the same bisection over the chains as locate, all of them in lock step: one
+        # searchsorted finds the edges of the middle chains, one vectorised orientation decides the sides.
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+
+        inside = (y >= self.y_list[0]) & (y <= self.y_list[-1]) if self.count else numpy.zeros(len(y), dtype=bool)
+        lo = numpy.zeros(len(y), dtype=numpy.int64)
+        hi = numpy.where(inside, self.count, 0)
+        # key of the query inside any chain, the same for all of them; the top y is the last distinct one and
+        # the rank one less there finds the edge arriving at it
+        rank = numpy.minimum(numpy.searchsorted(self.distinct_y, y, side="right"), len(self.distinct_y) - 1)
+
+        active = numpy.flatnonzero(inside)
+        while len(active):
+            active_lo, active_hi = lo[active], hi[active]
+            middle = (active_lo + active_hi) // 2
+
+            # first vertex of the middle chain above y, kept off both chain ends like segment does
+            upper = numpy.searchsorted(self.keys, middle * self.stride + rank[active], side="right")
+            upper = numpy.clip(upper, self.starts[middle] + 1, self.starts[middle + 1] - 1)
+            lower = upper - 1
+
+            left_of = orientations(self.x[lower], self.y[lower], self.x[upper], self.y[upper],
+                                   x[active], y[active]) >= 0
+
+            active_hi = numpy.where(left_of, middle, active_hi)
+            active_lo = numpy.where(left_of, active_lo, middle + 1)
+            hi[active] = active_hi
+            lo[active] = active_lo
+            active = active[active_lo < active_hi]
+
+        location = numpy.stack((lo - 1, numpy.where(lo < self.count, lo, -1)), axis=1)
+        location[~inside] = -1
+        return location
@@ -0,0 +1,170 @@
+from bisect import bisect_left, bisect_right
+
+import numpy
+
+from GeometryKernel.predicates import ORIENTATION_FILTER, orientation
+from GeometryKernel.vectorized import orientations
+from Lab1_PointLocalization_Chains.locator import Locator
+
+
+def owners(first, last, count):
+    # for every edge carried by chains first .. last the first of them the bisection of locate visits, the
+    # chain tree node of the edge; it is an ancestor of every other node in the range
+    lo = numpy.zeros(len(first), dtype=numpy.int64)
+    hi = numpy.full(len(first), count, dtype=numpy.int64)
+    found = numpy.empty(len(first), dtype=numpy.int64)
+
+    active = numpy.arange(len(first))
+    while len(active):
+        middle = (lo[active] + hi[active]) // 2
+        inside = (first[active] <= middle) & (middle <= last[active])
+        found[active[inside]] = middle[inside]
+
+        lo[active] = numpy.where(middle < first[active], middle + 1, lo[active])
+        hi[active] = numpy.where(middle > last[active], middle, hi[active])
+        active = active[~inside]
+
+    return found
+
+
+class ChainTree(Locator):
+    # Compressed chain tree: the chains are the nodes of the bisection locate runs over them, and every
+    # edge is stored once, at the node of the first chain carrying it that the bisection visits. Storage
+    # is O(V + E) where the chains themselves can add up to O(V E).
+    #
+    # A node only knows its own (proper) edges. Where chain m runs along an edge stored higher up, the
+    # ancestor's test has settled the side of every chain carrying that edge: left of it means left of
+    # chains first .. and everything after, right of it means right of .. last and everything before.
+    # locate keeps those bounds, so when chain m is not settled by them its edge at the query's height
+    # is one of its own. The answers are the ones ChainIndex gives.
+    FIELDS = ("node_starts", "lower_x", "lower_y", "upper_x", "upper_y", "first", "last", "distinct_y", "keys",
+              "y_range")
+
+    def __init__(self, graph):
+        # graph is a Graph or an ArrayGraph
+        lower, upper, first, last = graph.chain_edge_arrays()
+        x, y = graph.coordinates()
+
+        count = int(last.max()) + 1 if len(last) else 0
+        self.y_range = numpy.array([y[0], y[-1]] if len(y) else [0.0, 0.0], dtype=numpy.float64)
+
+        # the proper edges of every node bottom to top, the nodes one after another
+        edge_owners = owners(first, last, count)
+        order = numpy.lexsort((lower, edge_owners))
+        edge_owners, lower, upper = edge_owners[order], lower[order], upper[order]
+        self.node_starts = numpy.searchsorted(edge_owners, numpy.arange(count + 1))
+
+        self.lower_x, self.lower_y = x[lower], y[lower]
+        self.upper_x, self.upper_y = x[upper], y[upper]
+        self.first, self.last = first[order], last[order]
+
+        # batched queries: key node * stride + rank of the lower y, see ChainIndex
+        self.distinct_y = numpy.unique(self.lower_y)
+        self.keys = edge_owners * (len(self.distinct_y) + 1) + numpy.searchsorted(self.distinct_y, self.lower_y,
+                                                                                   side="right")
+        self.unpack()
+
+    def unpack(self):
+        # the numbers the queries read, derived from the arrays
+        self.count = len(self.node_starts) - 1
+        self.y_min, self.y_max = self.y_range.tolist()
+        self.stride = len(self.distinct_y) + 1
+
+        # single queries read Python lists, as in ChainIndex; they are made by the first one, a loaded tree
+        # that only answers batches never needs them
+        self.lower_x_list = self.lower_y_list = self.upper_x_list = self.upper_y_list = None
+        self.first_list = self.last_list = self.node_start_list = None
+
+    def make_lists(self):
+        self.lower_x_list, self.lower_y_list = self.lower_x.tolist(), self.lower_y.tolist()
+        self.upper_x_list, self.upper_y_list = self.upper_x.tolist(), self.upper_y.tolist()
+        self.first_list, self.last_list = self.first.tolist(), self.last.tolist()
+        self.node_start_list = self.node_starts.tolist()
+        # the largest absolute edge coordinate, for the semi-static orientation filter of locate
+        self.magnitude = max((float(abs(values).max()) for values in (self.lower_x, self.lower_y, self.upper_x,
+                                                                       self.upper_y) if len(values)), default=0.0)
+
+    def __len__(self):
+        return self.count
+
+    def edge(self, node, y):
+        # the proper edge of node at y, the last one starting at or below y, at the top the last one starting
+        # below it (see ChainIndex); reads the lists
+        if y >= self.y_max:
+            return bisect_left(self.lower_y_list, y, self.node_start_list[node], self.node_start_list[node + 1]) - 1
+        return bisect_right(self.lower_y_list, y, self.node_start_list[node], self.node_start_list[node + 1]) - 1
+
+    def locate(self, x, y):
+        # (left, right) chain indices around the point, None past the outer chains, as ChainIndex.locate
+        if not self.count or not self.y_min <= y <= self.y_max:
+            return None, None
+        if self.node_start_list is None:
+            self.make_lists()
+
+        lower_x, lower_y, upper_x, upper_y = self.lower_x_list, self.lower_y_list, self.upper_x_list, self.upper_y_list
+        # float turns beyond high decide a test, the others are passed to the adaptive predicate
+        magnitude = max(self.magnitude, abs(x), abs(y))
+        high = ORIENTATION_FILTER * magnitude * magnitude
+
+        lo, hi = 0, self.count
+        # every chain from settled_hi on has the point on its left, every chain before settled_lo on its right
+        settled_lo, settled_hi = 0, self.count
+
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if middle >= settled_hi:
+                hi = middle
+            elif middle < settled_lo:
+                lo = middle + 1
+            else:
+                edge = self.edge(middle, y)
+                ax, ay, bx, by = lower_x[edge], lower_y[edge], upper_x[edge], upper_y[edge]
+                determinant = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+                if determinant > high or (determinant >= -high and orientation(ax, ay, bx, by, x, y) >= 0):
+                    hi = middle
+                    settled_hi = self.first_list[edge]
+                else:
+                    lo = middle + 1
+                    settled_lo = self.last_list[edge] + 1
+
+        return lo - 1 if lo > 0 else None, lo if lo < self.count else None
+
+    def locate_many(self, points):
+        # locate for an (n, 2) array of points, -1 for None, in lock step as ChainIndex.locate_many
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+
+        inside = (y >= self.y_min) & (y <= self.y_max) if self.count else numpy.zeros(len(y), dtype=bool)
+        lo = numpy.zeros(len(y), dtype=numpy.int64)
+        hi = numpy.where(inside, self.count, 0)
+        settled_lo = numpy.zeros(len(y), dtype=numpy.int64)
+        settled_hi = numpy.full(len(y), self.count, dtype=numpy.int64)
+        # at the top the edges arriving there, the last ones starting below it
+        rank = numpy.where(y < self.y_max, numpy.searchsorted(self.distinct_y, y, side="right"),
+                           numpy.searchsorted(self.distinct_y, y, side="left"))
+
+        active = numpy.flatnonzero(inside)
+        while len(active):
+            active_lo, active_hi = lo[active], hi[active]
+            middle = (active_lo + active_hi) // 2
+
+            left_of = middle >= settled_hi[active]
+            tested = numpy.flatnonzero(~left_of & (middle >= settled_lo[active]))
+            if len(tested):
+                queries = active[tested]
+                edges = numpy.searchsorted(self.keys, middle[tested] * self.stride + rank[queries], side="right") - 1
+                left_of_edge = orientations(self.lower_x[edges], self.lower_y[edges], self.upper_x[edges],
+                                            self.upper_y[edges], x[queries], y[queries]) >= 0
+                left_of[tested] = left_of_edge
+                settled_hi[queries] = numpy.where(left_of_edge, self.first[edges], settled_hi[queries])
+                settled_lo[queries] = numpy.where(left_of_edge, settled_lo[queries], self.last[edges] + 1)
+
+            active_hi = numpy.where(left_of, middle, active_hi)
+            active_lo = numpy.where(left_of, active_lo, middle + 1)
+            hi[active] = active_hi
+            lo[active] = active_lo
+            active = active[active_lo < active_hi]
+
+        location = numpy.stack((lo - 1, numpy.where(lo < self.count, lo, -1)), axis=1)
+        location[~inside] = -1
+        return location
@@ -0,0 +1,70 @@
+import threading
+
+import numpy
+
+from Lab1_PointLocalization_Chains.chain_tree import ChainTree
+
+
+class DynamicSubdivision:
+    # A subdivision that grows while it is being queried. update adds vertices and edges to a copy of the
+    # graph, keeps the weights it has and only pushes the differences the new edges make along single paths
+    # (ArrayGraph.rebalance), builds a new locator of the result and then swaps graph and locator in with one
+    # assignment. Readers never wait: a query takes the locator there is when it starts, the old one until
+    # the swap and the new one after it. Updates are serialised by a lock.
+    #
+    # Vertices are named by ids that do not change: the rows of the graph it starts from, then the vertices
+    # every update adds, numbered on. numbers maps them to the vertex numbers of the current graph, which
+    # prepare and every update with new vertices change; it is swapped in with the graph.
+    #
+    # Every new edge adds a unit of weight from the bottom to the top, so the chains grow in number faster
+    # than a fresh balance would make them; once they are growth times as many as after the last full
+    # balance, the update balances the grown graph from scratch instead, off to the side like the rest.
+    def __init__(self, graph, locator_type=ChainTree, growth=2):
+        # graph is an ArrayGraph, prepared or not, locator_type a Locator
+        numbers = graph.prepare() if graph.offsets is None else numpy.arange(len(graph))
+        self.locator_type = locator_type
+        self.growth = growth
+        self.lock = threading.Lock()
+        self.state = (graph, locator_type(graph), numbers)
+        self.balanced_count = graph.chains_count()
+
+    @property
+    def graph(self):
+        return self.state[0]
+
+    @property
+    def locator(self):
+        return self.state[1]
+
+    @property
+    def numbers(self):
+        # the vertex number in graph of every id
+        return self.state[2]
+
+    def locate(self, x, y):
+        return self.state[1].locate(x, y)
+
+    def locate_many(self, points):
+        return self.state[1].locate_many(points)
+
+    def update(self, vertices=(), edges=()):
+        # Adds vertices, (k, 2) coordinates, and edges, (m, 2) vertex ids: the vertices there are by their ids,
+        # the new ones as len(graph) + i, which become their ids. The edges must not cross any other; if a
+        # vertex is left without an edge below or above it, ValueError and nothing changes.
+        vertices = numpy.asarray(vertices, dtype=numpy.float64).reshape(-1, 2)
+        edges = numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2)
+
+        with self.lock:
+            graph, _, numbers = self.state
+
+            # ids to the numbers ArrayGraph.extended takes, the new vertices after the current ones
+            numbers = numpy.concatenate((numbers, numpy.arange(len(graph), len(graph) + len(vertices))))
+            grown, renumbering = graph.extended(vertices, numbers[edges])
+            grown.weights = numpy.concatenate((graph.weights, numpy.ones(len(edges), dtype=numpy.int64)))
+            grown.rebalance()
+
+            if grown.chains_count() > self.growth * self.balanced_count:
+                grown.balance_algorithm()
+                self.balanced_count = grown.chains_count()
+
+            self.state = (grown, self.locator_type(grown), renumbering[numbers])
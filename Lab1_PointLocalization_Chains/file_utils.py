@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+
+# A graph file holds the vertex count, the edge count, one "x y" line per vertex, one "first second" line
+# per edge and the query point "x y" on the last line.
+
+# Index files hold named flat arrays: this header, the version, the number of arrays, one INDEX_ENTRY_DTYPE
+# entry per array and the arrays themselves, each starting on an INDEX_ALIGNMENT boundary so that it can be
+# used straight from a memory map. The version changes whenever the arrays a reader expects change.
+INDEX_MAGIC = b"CHAINIDX"
+INDEX_VERSION = 2
+INDEX_HEADER_DTYPE = np.dtype([("version", "<u4"), ("count", "<u4")])
+INDEX_ENTRY_DTYPE = np.dtype([("name", "S32"), ("dtype", "S8"), ("length", "<i8"), ("offset", "<i8")])
+INDEX_ALIGNMENT = 64
+
+
+def parse_graph(path):
+    # (vertex coordinates as a (V, 2) array, edges as a (E, 2) array of vertex indices, query point or None)
+    with open(path) as file:
+        vertices_count = int(file.readline())
+        edges_count = int(file.readline())
+
+        # loadtxt stops after max_rows lines, the next block is read from there
+        vertices = np.loadtxt(file, dtype=np.float64, max_rows=vertices_count, ndmin=2).reshape(-1, 2)
+        edges = np.loadtxt(file, dtype=np.int64, max_rows=edges_count, ndmin=2).reshape(-1, 2)
+
+        tokens = file.readline().split()
+        query = np.array(tokens[:2], dtype=np.float64) if len(tokens) >= 2 else None
+
+    return vertices, edges, query
+
+
+def cache_path(path):
+    return path + ".npz"
+
+
+def index_path(path):
+    return path + ".chains"
+
+
+def file_key(path):
+    # what a copy derived from the file is checked against: its modification time and size
+    status = os.stat(path)
+    return np.array([status.st_mtime_ns, status.st_size], dtype=np.int64)
+
+
+def read_graph_arrays(path, cache=False):
+    # parse_graph, with cache=True through a .npz copy next to the file that is rebuilt whenever the
+    # file's modification time or size changes
+    if not cache:
+        return parse_graph(path)
+
+    key = file_key(path)
+
+    if os.path.exists(cache_path(path)):
+        with np.load(cache_path(path)) as cached:
+            if np.array_equal(cached["key"], key):
+                query = cached["query"]
+                return cached["vertices"], cached["edges"], query if len(query) else None
+
+    vertices, edges, query = parse_graph(path)
+
+    # written aside and moved into place, so a reader never sees half a cache
+    temporary_path = f"{cache_path(path)}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.savez(file, key=key, vertices=vertices, edges=edges,
+                 query=query if query is not None else np.empty(0, dtype=np.float64))
+    os.replace(temporary_path, cache_path(path))
+
+    return vertices, edges, query
+
+
+def index_layout(arrays):
+    # (the INDEX_ENTRY_DTYPE entries, the total size in bytes) of arrays laid out as in an index file
+    entries = np.zeros(len(arrays), dtype=INDEX_ENTRY_DTYPE)
+
+    offset = len(INDEX_MAGIC) + INDEX_HEADER_DTYPE.itemsize + entries.nbytes
+    for i, (name, array) in enumerate(arrays.items()):
+        # empty arrays stay where they are, an offset past the end of the file could not be mapped
+        if len(array):
+            offset = -(-offset // INDEX_ALIGNMENT) * INDEX_ALIGNMENT
+        entries[i] = (name.encode(), array.dtype.newbyteorder("<").str.encode(), len(array), offset)
+        offset += array.nbytes
+
+    return entries, offset
+
+
+def index_arrays(buffer, entries):
+    # the arrays of index_layout entries as views of buffer
+    return {name.decode(): np.frombuffer(buffer, dtype=dtype.decode(), count=length, offset=offset)
+            for name, dtype, length, offset in entries.tolist()}
+
+
+def write_index(path, arrays):
+    # arrays is a dict of one dimensional arrays, written aside and moved into place like the cache
+    arrays = {name: np.ascontiguousarray(array).reshape(-1) for name, array in arrays.items()}
+    entries, _ = index_layout(arrays)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(INDEX_MAGIC)
+        np.array((INDEX_VERSION, len(arrays)), dtype=INDEX_HEADER_DTYPE).tofile(file)
+        entries.tofile(file)
+        for entry, array in zip(entries.tolist(), arrays.values()):
+            _, dtype, _, offset = entry
+            file.write(bytes(offset - file.tell()))
+            array.astype(dtype.decode(), copy=False).tofile(file)
+    os.replace(temporary_path, path)
+
+
+def read_index(path):
+    # the arrays of an index file as read only views of one memory map: nothing is read until it is used,
+    # and processes mapping the same file share its pages
+    with open(path, "rb") as file:
+        if file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+            raise ValueError(f"{path} is not an index file")
+        header = np.fromfile(file, dtype=INDEX_HEADER_DTYPE, count=1)
+        if len(header) != 1 or header["version"][0] != INDEX_VERSION:
+            raise ValueError(f"{path} is not an index file of version {INDEX_VERSION}")
+        entries = np.fromfile(file, dtype=INDEX_ENTRY_DTYPE, count=int(header["count"][0]))
+
+    return index_arrays(np.memmap(path, dtype=np.uint8, mode="r"), entries)
@@ -0,0 +1,70 @@
+from functools import lru_cache
+
+# answers kept by default
+CAPACITY = 1 << 16
+
+
+class LocationCache:
+    # locate in front of a Locator (ChainTree, SlabTree) or a DynamicSubdivision, for query streams that come
+    # back to the same points over and over: the answers of the last capacity keys are kept, least recently
+    # used out first. It locates single points as the locator does, so it goes wherever a locator does,
+    # point_localization included; locate_many is passed on uncached.
+    #
+    # A key is the point rounded to a multiple of quantum, the point itself without one, and the answer for
+    # it is that of the rounded point: points closer than quantum to a chain may get the other side of it,
+    # so quantum should be below the precision of the query coordinates. The locator answering belongs to
+    # the key, so once a DynamicSubdivision swaps in a new one nothing of the old one is found any more,
+    # not even an answer a reader stores after the swap; the first query that sees the new one empties the
+    # cache. hits and misses count from the start across all of that, until clear().
+    def __init__(self, source, capacity=CAPACITY, quantum=None):
+        self.source = source
+        self.quantum = quantum
+        self.locator = None
+        self.cached = lru_cache(maxsize=capacity)(self.locate_key)
+        # the counts of lru_cache before it was last emptied
+        self.earlier_hits = self.earlier_misses = 0
+
+    def current_locator(self):
+        # a DynamicSubdivision has the locator answering now, a locator is its own
+        return getattr(self.source, "locator", self.source)
+
+    def locate_key(self, locator, x, y):
+        if self.quantum:
+            x, y = x * self.quantum, y * self.quantum
+        return locator.locate(x, y)
+
+    def locate(self, x, y):
+        locator = self.current_locator()
+        if locator is not self.locator:
+            self.invalidate()
+            self.locator = locator
+
+        if self.quantum:
+            x, y = round(x / self.quantum), round(y / self.quantum)
+        return self.cached(locator, x, y)
+
+    def locate_many(self, points):
+        return self.current_locator().locate_many(points)
+
+    def invalidate(self):
+        # forgets every answer, the counters go on
+        info = self.cached.cache_info()
+        self.earlier_hits += info.hits
+        self.earlier_misses += info.misses
+        self.cached.cache_clear()
+
+    def clear(self):
+        # forgets every answer and resets the counters
+        self.cached.cache_clear()
+        self.earlier_hits = self.earlier_misses = 0
+
+    @property
+    def hits(self):
+        return self.earlier_hits + self.cached.cache_info().hits
+
+    @property
+    def misses(self):
+        return self.earlier_misses + self.cached.cache_info().misses
+
+    def __len__(self):
+        return self.cached.cache_info().currsize
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+
+from Lab1_PointLocalization_Chains.file_utils import read_index, write_index
+
+
+class Locator(ABC):
+    # A point location structure built from a Graph (or an ArrayGraph) over its separating chains. locate gives
+    # the (left, right) indices of the chains around a point, None past the outer chains and for points
+    # outside the subdivision; locate_many does that for an (n, 2) array of points with -1 for None. All
+    # locators give the same answers.
+    #
+    # A locator is the arrays named in FIELDS and nothing else: save writes them to an index file, load maps
+    # them back and from_arrays takes them as they are, without building anything. unpack derives whatever
+    # else the queries read from the arrays.
+    FIELDS = ()
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        locator = cls.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(locator, name, arrays[name])
+        locator.unpack()
+        return locator
+
+    @classmethod
+    def load(cls, path):
+        # a saved locator as views of a memory map of the file, ValueError if it is no index of this version
+        arrays = read_index(path)
+        missing = [name for name in cls.FIELDS if name not in arrays]
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(missing)}")
+        return cls.from_arrays(arrays)
+
+    def save(self, path, **extra):
+        # extra arrays are stored next to the locator, for whoever loads the file
+        write_index(path, {**{name: getattr(self, name) for name in self.FIELDS}, **extra})
+
+    def unpack(self):
+        pass
+
+    @abstractmethod
+    def locate(self, x, y):
+        pass
+
+    @abstractmethod
+    def locate_many(self, points):
+        pass
@@ -1,10 +1,18 @@
-import copy
+import gc
 import math
+import os
 import sys
+from bisect import bisect_right
 
 import matplotlib.pyplot as plt
 import numpy
 
+from GeometryKernel.predicates import ORIENTATION_ERROR_SQUARED, ORIENTATION_FILTER, exact_orientation, orientation
+from Lab1_PointLocalization_Chains.array_graph import adjacency_order, array_graph_from_file
+from Lab1_PointLocalization_Chains.chain_tree import ChainTree
+from Lab1_PointLocalization_Chains.file_utils import file_key, index_path, read_graph_arrays, read_index
+from Lab1_PointLocalization_Chains.sweep_line import SweepLine
+
 
 class Vertex:
     def __init__(self, x_coordinate, y_coordinate, n) -> None:
@@ -16,6 +24,11 @@ class Vertex:
         self.n = n
         self.weight = 1
         self.neighbours = []
+        # id of the edge to each neighbour, in_edges and out_edges follow in_list and out_list
+        self.edge_ids = []
+        self.in_edges = None
+        self.out_edges = None
+        self.neighbour_numbers = None
 
     def set_number(self, new_number):
         self.n = new_number
@@ -33,31 +46,31 @@ class Vertex:
         return str(f"{self.n}: ({self.x}; {self.y})")
 
     def create_in_out_lists(self):
-        self.in_list = []
-        self.out_list = []
-
-        for neighbour in self.neighbours:
-            if neighbour.n < self.n:
-                self.in_list.append(neighbour)
-            else:
-                self.out_list.append(neighbour)
-
-        self.in_list = sort_clockwise(self.in_list, self)
-        self.in_list.reverse()
-
-        self.out_list = sort_clockwise(self.out_list, self)
+        # the vertex itself is 0 and its neighbours 1, 2, ..., see Graph.prepare_in_out_lists for all at once
+        x = numpy.array([self.x] + [vertex.x for vertex in self.neighbours], dtype=numpy.float64)
+        y = numpy.array([self.y] + [vertex.y for vertex in self.neighbours], dtype=numpy.float64)
+        is_out = numpy.array([vertex.n > self.n for vertex in self.neighbours], dtype=bool)
+        order = adjacency_order(x, y, numpy.zeros(len(self.neighbours), dtype=numpy.int64),
+                                numpy.arange(1, len(self.neighbours) + 1), is_out).tolist()
+        in_count = len(self.neighbours) - int(is_out.sum())
+
+        neighbours = [self.neighbours[k] for k in order]
+        edge_ids = [self.edge_ids[k] for k in order]
+        self.in_list, self.out_list = neighbours[:in_count], neighbours[in_count:]
+        self.in_edges, self.out_edges = edge_ids[:in_count], edge_ids[in_count:]
+        # numbers are fixed from here on, the set is built by the first membership test
+        self.neighbour_numbers = None
+
+    def is_neighbour_number(self, index):
+        if self.neighbour_numbers is None:
+            self.neighbour_numbers = {vertex.n for vertex in self.neighbours}
+        return index in self.neighbour_numbers
 
     def is_index_in_in_list(self, index):
-        for vertex in self.in_list:
-            if vertex.n == index:
-                return True
-        return False
+        return index < self.n and self.is_neighbour_number(index)
 
     def is_index_in_out_list(self, index):
-        for vertex in self.out_list:
-            if vertex.n == index:
-                return True
-        return False
+        return index > self.n and self.is_neighbour_number(index)
 
     def plot(self, ax):
         ax.scatter(self.x, self.y, cmap='winter', color="green")
@@ -83,53 +96,97 @@ class Vertex:
 class Graph:
     def __init__(self):
         self.vertices = []
+        self.edges = []
+        # weight of every edge by edge id, the chains running along it
         self.weights = None
+        # vertex heights, the SweepLine's state at each and the SweepLine, for get_edges_at_y
+        self.sweep = None
 
     def add_vertex(self, vertex):
         self.vertices.append(vertex)
+        self.sweep = None
 
     def add_edge(self, first, second):
+        self.sweep = None
+        edge_id = len(self.edges)
+        self.edges.append((self.vertices[first], self.vertices[second]))
+
         self.vertices[first].neighbours.append(self.vertices[second])
+        self.vertices[first].edge_ids.append(edge_id)
         self.vertices[second].neighbours.append(self.vertices[first])
+        self.vertices[second].edge_ids.append(edge_id)
 
     def init_weights(self):
-        self.weights = []
-        for i, _ in enumerate(self.vertices):
-            self.weights.append([-1] * len(self.vertices))
-
-        for vertex in self.vertices:
-            for another_vertex in vertex.neighbours:
-                self.weights[vertex.n][another_vertex.n] = 1
+        self.weights = [1] * len(self.edges)
 
     def find_chains(self):
         self.sort_vertices()
         self.balance_algorithm()
-        weights = copy.deepcopy(self.weights)
+        weights = self.weights.copy()
 
         chains_count = 0
-        for vertex in self.vertices[0].out_list:
-            chains_count += weights[self.vertices[0].n][vertex.n]
+        for edge in self.vertices[0].out_edges:
+            chains_count += weights[edge]
+
+        # the left most out edge of every vertex that some chain still has to take, the ones before it are used up
+        cursors = [0] * len(self.vertices)
+        last_vertex = self.vertices[-1]
 
         chains = []
         for _ in range(chains_count):
             chain = []
             current_vertex = self.vertices[0]
-            while current_vertex != self.vertices[-1]:
+            while current_vertex is not last_vertex:
                 chain.append(current_vertex)
-                j = 0
-                while weights[current_vertex.n][current_vertex.out_list[j].n] < 1:
-                    j += 1
+                j = cursors[current_vertex.n]
+                edge = current_vertex.out_edges[j]
 
-                weights[current_vertex.n][current_vertex.out_list[j].n] -= 1
-                weights[current_vertex.out_list[j].n][current_vertex.n] -= 1
+                weights[edge] -= 1
+                if weights[edge] == 0:
+                    cursors[current_vertex.n] = j + 1
                 current_vertex = current_vertex.out_list[j]
 
-            chain.append(self.vertices[-1])
+            chain.append(last_vertex)
 
             chains.append(chain)
 
         return chains
 
+    def chain_edges(self):
+        # (lower vertex, upper vertex, first chain, last chain) for every edge, without building the chains:
+        # the chains through a vertex are numbered consecutively and leave it through its out edges from
+        # left to right, as find_chains extracts them, so an edge of weight w carries w consecutive chains
+        self.sort_vertices()
+        self.balance_algorithm()
+
+        first_chains = [None] * len(self.vertices)
+        first_chains[0] = 0
+
+        for vertex in self.vertices:
+            chain = first_chains[vertex.n]
+            for another_vertex, edge in zip(vertex.out_list, vertex.out_edges):
+                weight = self.weights[edge]
+                yield vertex, another_vertex, chain, chain + weight - 1
+
+                if first_chains[another_vertex.n] is None or chain < first_chains[another_vertex.n]:
+                    first_chains[another_vertex.n] = chain
+                chain += weight
+
+    def chain_edge_arrays(self):
+        # chain_edges as arrays of vertex numbers and chain numbers: lower, upper, first chain, last chain
+        edges = list(self.chain_edges())
+        lower = numpy.fromiter((lower.n for lower, _, _, _ in edges), dtype=numpy.int64, count=len(edges))
+        upper = numpy.fromiter((upper.n for _, upper, _, _ in edges), dtype=numpy.int64, count=len(edges))
+        first = numpy.fromiter((first for _, _, first, _ in edges), dtype=numpy.int64, count=len(edges))
+        last = numpy.fromiter((last for _, _, _, last in edges), dtype=numpy.int64, count=len(edges))
+        return lower, upper, first, last
+
+    def coordinates(self):
+        # x and y arrays of the vertices by vertex number
+        x = numpy.fromiter((vertex.x for vertex in self.vertices), dtype=numpy.float64, count=len(self.vertices))
+        y = numpy.fromiter((vertex.y for vertex in self.vertices), dtype=numpy.float64, count=len(self.vertices))
+        return x, y
+
     def sort_vertices(self):
         self.vertices.sort()
         for i, vertex in enumerate(self.vertices):
@@ -162,11 +219,11 @@ class Graph:
         ax.set_ylim([min(ys) - 1, max(ys) + 1])
 
         for vertex in self.vertices:
-            for neighbour in vertex.neighbours:
+            for neighbour, edge in zip(vertex.neighbours, vertex.edge_ids):
                 ax.plot([vertex.x, neighbour.x], [vertex.y, neighbour.y], "b")
 
                 if self.weights is not None:
-                    ax.annotate(self.weights[vertex.n][neighbour.n],
+                    ax.annotate(self.weights[edge],
                                 ((vertex.x + neighbour.x) / 2, (vertex.y + neighbour.y) / 2), color="purple")
 
         # 4. Customize plot
@@ -183,124 +240,211 @@ class Graph:
 
         self.prepare_in_out_lists()
 
+        # in and out weight of every vertex, kept up to date as edges gain weight; all weights start at 1
+        w_in = [len(vertex.in_edges) for vertex in self.vertices]
+        w_out = [len(vertex.out_edges) for vertex in self.vertices]
+
         for index in range(1, len(self.vertices) - 1):
             current_vertex = self.vertices[index]
-            leftest_vertex = current_vertex.out_list[0]
-            w_in = 0
-            for vertex in current_vertex.in_list:
-                w_in += self.weights[vertex.n][current_vertex.n]
-
-            w_out = 0
-            for vertex in current_vertex.out_list:
-                w_out += self.weights[current_vertex.n][vertex.n]
-
-            if w_in > w_out:
-                self.weights[current_vertex.n][leftest_vertex.n] += w_in - w_out
-                self.weights[leftest_vertex.n][current_vertex.n] = self.weights[current_vertex.n][leftest_vertex.n]
+            if w_in[index] > w_out[index]:
+                difference = w_in[index] - w_out[index]
+                self.weights[current_vertex.out_edges[0]] += difference
+                w_out[index] += difference
+                w_in[current_vertex.out_list[0].n] += difference
 
         for index in range(len(self.vertices) - 1, 0, -1):
             current_vertex = self.vertices[index]
-            leftest_vertex = current_vertex.in_list[0]
-            w_in = 0
-            for vertex in current_vertex.in_list:
-                w_in += self.weights[vertex.n][current_vertex.n]
-
-            w_out = 0
-            for vertex in current_vertex.out_list:
-                w_out += self.weights[current_vertex.n][vertex.n]
-
-            if w_out > w_in:
-                self.weights[leftest_vertex.n][current_vertex.n] += w_out - w_in
-                self.weights[current_vertex.n][leftest_vertex.n] = self.weights[leftest_vertex.n][current_vertex.n]
+            if w_out[index] > w_in[index]:
+                difference = w_out[index] - w_in[index]
+                self.weights[current_vertex.in_edges[0]] += difference
+                w_in[index] += difference
+                w_out[current_vertex.in_list[0].n] += difference
 
     def prepare_in_out_lists(self):
-        for i, vertex in enumerate(self.vertices):
-            vertex.create_in_out_lists()
+        # Vertex.create_in_out_lists for all vertices with one sort over the ends of all edges; the garbage
+        # collector is paused while the lists are cut, as in graph_from_arrays
+        vertices = self.vertices
+        x, y = self.coordinates()
+        lengths = numpy.fromiter((len(vertex.neighbours) for vertex in vertices), dtype=numpy.int64,
+                                 count=len(vertices))
+        total = int(lengths.sum())
+
+        tails = numpy.repeat(numpy.arange(len(vertices), dtype=numpy.int64), lengths)
+        heads = numpy.fromiter((neighbour.n for vertex in vertices for neighbour in vertex.neighbours),
+                               dtype=numpy.int64, count=total)
+        edge_ids = numpy.fromiter((edge for vertex in vertices for edge in vertex.edge_ids), dtype=numpy.int64,
+                                  count=total)
+        is_out = heads > tails
+        order = adjacency_order(x, y, tails, heads, is_out)
+
+        # in list of vertex i from bounds[i] to middles[i], out list from there to bounds[i + 1]
+        bounds = numpy.zeros(len(vertices) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=bounds[1:])
+        middles = bounds[:-1] + numpy.bincount(tails[~is_out], minlength=len(vertices))
+
+        collecting = gc.isenabled()
+        gc.disable()
+
+        try:
+            neighbours = [vertices[k] for k in heads[order].tolist()]
+            edge_ids = edge_ids[order].tolist()
+
+            for vertex, start, middle, stop in zip(vertices, bounds[:-1].tolist(), middles.tolist(),
+                                                   bounds[1:].tolist()):
+                vertex.in_list, vertex.out_list = neighbours[start:middle], neighbours[middle:stop]
+                vertex.in_edges, vertex.out_edges = edge_ids[start:middle], edge_ids[middle:stop]
+                vertex.neighbour_numbers = None
+        finally:
+            if collecting:
+                gc.enable()
 
     def get_edges_at_y(self, y_coordinate):
-        edges = []
-
-        for vertex in self.vertices:
-            for another_vertex in vertex.neighbours:
-                if vertex.y >= y_coordinate >= another_vertex.y or vertex.y <= y_coordinate <= another_vertex.y:
-                    edge = [vertex, another_vertex]
-                    edge.sort()
-                    is_exist = False
-                    for current_edge in edges:
-                        if current_edge == edge:
-                            is_exist = True
-                            break
-                    if not is_exist:
-                        edges.append(edge)
-
-        return sorted(edges, key=lambda edge: (((y_coordinate - edge[0].y) * (edge[1].x - edge[0].x)) /
-                                               (edge[1].y - edge[0].y) + edge[0].x))
-
-
-def point_localization(current_chains, point):
-    is_on_left = False
-    middle_pivot = int(len(current_chains) / 2 - 1)
-
-    if len(current_chains) > 1:
-        is_on_left = point_discrimination(current_chains[middle_pivot], point)
-
-        if not is_on_left and point_discrimination(current_chains[middle_pivot + 1], point):
-            return [current_chains[middle_pivot], current_chains[middle_pivot + 1]]
-
-    if len(current_chains) == 1:
-        if point_discrimination(current_chains[0], point):  # check it
-            return [None, current_chains[0]]
+        # [lower, upper] of the edges crossing the line at y_coordinate from left to right. At the height of a
+        # vertex those are the edges leaving it upwards and going past, not the ones ending there, and never a
+        # horizontal edge (see SweepLine). The first call sweeps the whole graph, O(V log E), sorting its
+        # vertices as find_chains does, and keeps the persistent state at every vertex height; a call is then a
+        # binary search for the state, O(log V), and O(k) for its k edges.
+        if self.sweep is None:
+            sweep_line = SweepLine(self)
+            heights, states = [], []
+            for y, active in sweep_line.snapshots():
+                heights.append(y)
+                states.append(active)
+            self.sweep = heights, states, sweep_line
+
+        heights, states, sweep_line = self.sweep
+        index = bisect_right(heights, y_coordinate) - 1
+        if index < 0:
+            return []
+        return [list(sweep_line.edge_vertices(edge)) for edge in states[index]]
+
+
+def point_localization(chains, point, locator=None, magnitude=None):
+    # [left, right] chains around point, as ChainIndex.locate_chains gives them; locator is a Locator
+    # (ChainTree, SlabTree) of the graph the chains come from, or a LocationCache of one for repeated points.
+    # Without one the chains are searched as they are, a bisection over them with point_discrimination:
+    # O(log^2 n) and nothing built, a ChainIndex built once is faster for many queries. magnitude is
+    # chains_magnitude(chains), worth passing for many points against the same chains.
+    if locator is None:
+        if not chains or not chains[0][0].y <= point.y <= chains[0][-1].y:
+            return [None, None]
+
+        if magnitude is None:
+            magnitude = chains_magnitude(chains)
+        magnitude = max(magnitude, abs(point.x), abs(point.y))
+        high = ORIENTATION_FILTER * magnitude * magnitude
+        lo, hi = 0, len(chains)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if point_discrimination(chains[middle], point, high):
+                hi = middle
+            else:
+                lo = middle + 1
+        return [chains[lo - 1] if lo > 0 else None, chains[lo] if lo < len(chains) else None]
+
+    left, right = locator.locate(point.x, point.y)
+    return [chains[left] if left is not None else None, chains[right] if right is not None else None]
+
+
+def chains_magnitude(chains):
+    # The largest absolute coordinate of the chains' vertices, for the semi-static orientation filter. Every
+    # vertex lies between the outer chains, so the smallest x of the first and the largest x of the last one
+    # bound all x, the ends of the chains all y: only the outer chains are read.
+    if not chains:
+        return 0.0
+    return max(-min(vertex.x for vertex in chains[0]), max(vertex.x for vertex in chains[-1]),
+               abs(chains[0][0].y), abs(chains[0][-1].y))
+
+
+def point_discrimination(chain, point, high=None):
+    # the side of the chain's edge at point.y, the edge arriving at the top on the top row (see ChainIndex);
+    # high is a bound of the semi-static filter for the chain and point, see is_left
+    lo, hi = 0, len(chain) - 1
+    top = point.y >= chain[-1].y
+    while hi - lo > 1:
+        middle = (lo + hi) // 2
+        if point.y < chain[middle].y or top and point.y == chain[middle].y:
+            hi = middle
         else:
-            return [current_chains[0], None]
-
-    if is_on_left:
-        return point_localization(current_chains[:middle_pivot + 1], point)
-    else:
-        return point_localization(current_chains[middle_pivot + 1:], point)
-
-
-def point_discrimination(chain, point):
-    if len(chain) == 2:
-        return is_left(chain[0], chain[1], point)
-    length = len(chain)
-    middle_pivot = int(length / 2)
-    if point.y < chain[middle_pivot].y:
-        return point_discrimination(chain[:middle_pivot + 1], point)
-    else:
-        return point_discrimination(chain[middle_pivot:], point)
-
-
-def is_left(chain_point_1, chain_point_2, point):
-    return ((chain_point_2.x - chain_point_1.x) * (point.y - chain_point_1.y) - (chain_point_2.y - chain_point_1.y) * (
-            point.x - chain_point_1.x)) >= 0
-
-
-def sort_clockwise(vertices: list, center_vertex):
-    return sorted(vertices, key=lambda vertex: math.atan2(vertex.y - center_vertex.y,
-                                                          vertex.x - center_vertex.x), reverse=True)
-
-
-def graph_from_file(path):
-    file = open(path, "r")
-    vertices_count = int(file.readline())
-    edges_count = int(file.readline())
-
-    file_graph = Graph()
-
-    for i in range(vertices_count):
-        line = str(file.readline())
-        coordinates = line.split(sep=" ")
-        file_graph.add_vertex(Vertex(float(coordinates[0]), float(coordinates[1]), i))
-
-    for i in range(edges_count):
-        line = str(file.readline())
-        vertices = line.split(sep=" ")
-        file_graph.add_edge(int(vertices[0]), int(vertices[1]))
-
-    line = str(file.readline())
-    coordinates = line.split(sep=" ")
-
-    return file_graph, Vertex(float(coordinates[0]), float(coordinates[1]), -1)
+            lo = middle
+    return is_left(chain[lo], chain[hi], point, high)
+
+
+def is_left(chain_point_1, chain_point_2, point, high=None):
+    # orientation() >= 0; with high, a bound of the semi-static filter that covers the three points, the float
+    # turn decides outside [-high, high], without it orientation()'s own float filter is inlined
+    ax, ay, bx, by, x, y = chain_point_1.x, chain_point_1.y, chain_point_2.x, chain_point_2.y, point.x, point.y
+    if high is not None:
+        determinant = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+        return determinant > high or (determinant >= -high and orientation(ax, ay, bx, by, x, y) >= 0)
+
+    left, right = (bx - ax) * (y - ay), (by - ay) * (x - ax)
+    determinant, total = left - right, left + right
+    if determinant * determinant > ORIENTATION_ERROR_SQUARED * total * total:
+        return determinant > 0
+    return exact_orientation(ax, ay, bx, by, x, y) >= 0
+
+
+def graph_from_arrays(vertices, edges):
+    # The same graph as adding the vertices and then the edges one by one, with the adjacency lists cut out
+    # of the edges sorted by end point. The cyclic garbage collector is paused meanwhile: it would scan the
+    # growing graph over and over and take most of the time.
+    collecting = gc.isenabled()
+    gc.disable()
+
+    try:
+        file_graph = Graph()
+        file_graph.vertices = [Vertex(x, y, i) for i, (x, y) in enumerate(vertices.tolist())]
+        vertex_list = file_graph.vertices
+        file_graph.edges = [(vertex_list[first], vertex_list[second]) for first, second in edges.tolist()]
+
+        # both ends of every edge in edge order, a stable sort keeps that order within each vertex
+        ends = edges.reshape(-1)
+        order = numpy.argsort(ends, kind="stable")
+        neighbours = edges[:, ::-1].reshape(-1)[order].tolist()
+        edge_ids = (order // 2).tolist()
+        bounds = numpy.searchsorted(ends[order], numpy.arange(len(vertex_list) + 1)).tolist()
+
+        for i, vertex in enumerate(vertex_list):
+            start, stop = bounds[i], bounds[i + 1]
+            vertex.neighbours = [vertex_list[k] for k in neighbours[start:stop]]
+            vertex.edge_ids = edge_ids[start:stop]
+    finally:
+        if collecting:
+            gc.enable()
+
+    return file_graph
+
+
+def graph_from_file(path, cache=False):
+    # the graph and the query point of the last line, None if there is none; see file_utils.read_graph_arrays
+    vertices, edges, query = read_graph_arrays(path, cache)
+    point = Vertex(float(query[0]), float(query[1]), -1) if query is not None else None
+
+    return graph_from_arrays(vertices, edges), point
+
+
+def chain_tree_from_file(path, cache=False):
+    # The ChainTree of a graph file. With cache=True it is kept in an index file next to the graph file
+    # (file_utils.index_path) together with the graph file's key, and while that still matches the tree is
+    # mapped from there: a query worker starts without parsing, balancing or extracting anything.
+    if cache and os.path.exists(index_path(path)):
+        try:
+            arrays = read_index(index_path(path))
+        except ValueError:
+            # another version, rebuilt below
+            arrays = {}
+
+        if numpy.array_equal(arrays.get("source"), file_key(path)) and set(ChainTree.FIELDS) <= arrays.keys():
+            return ChainTree.from_arrays(arrays)
+
+    # the arrays straight from the file, no Vertex objects
+    graph, _ = array_graph_from_file(path, cache)
+    chain_tree = ChainTree(graph)
+    if cache:
+        chain_tree.save(index_path(path), source=file_key(path))
+
+    return chain_tree
 
 
 def plot_chain(chain, ax, color, shift):
@@ -311,25 +455,39 @@ def plot_chain(chain, ax, color, shift):
 
 
 if __name__ == '__main__':
+    # python main.py graph.txt [queries.txt] [--cache], a queries file holds one "x y" point per line;
+    # --cache keeps a parsed copy of graph.txt in graph.txt.npz and its chain tree in graph.txt.chains
     eps = 1e-4
-    graph, point = graph_from_file(sys.argv[1])
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+    cache = "--cache" in sys.argv[1:]
+
+    # the queries are answered before the graph is built for the plots
+    chain_tree = chain_tree_from_file(arguments[0], cache)
+    if len(arguments) > 1:
+        queries = numpy.loadtxt(arguments[1], ndmin=2)
+        for (x, y), (left, right) in zip(queries.tolist(), chain_tree.locate_many(queries).tolist()):
+            print(f"({x}; {y}): between chains {left} and {right}")
 
+    graph, point = graph_from_file(arguments[0], cache)
     chains = graph.find_chains()
+
     fig, ax = graph.show_plot()
 
-    ax = point.plot(ax)
+    # a graph file without a query line has no point to show
+    if point is not None:
+        ax = point.plot(ax)
 
     _, ax = plt.subplots(nrows=1, ncols=1, figsize=(10, 10))
 
     for i, chain in enumerate(chains):
         ax = plot_chain(chain, ax, numpy.random.rand(3, ), numpy.random.rand() * 0.1)
 
-    _, ax = plt.subplots(nrows=1, ncols=1, figsize=(10, 10))
+    if point is not None:
+        _, ax = plt.subplots(nrows=1, ncols=1, figsize=(10, 10))
 
-    location = point_localization(chains, point)
-    for i, chain in enumerate(location):
-        if chain is not None:
-            ax = plot_chain(chain, ax, numpy.random.rand(3, ), 0)
+        for chain_number in chain_tree.locate(point.x, point.y):
+            if chain_number is not None:
+                ax = plot_chain(chains[chain_number], ax, numpy.random.rand(3, ), 0)
 
-    ax = point.plot(ax)
+        ax = point.plot(ax)
     plt.show()
@@ -0,0 +1,93 @@
+import atexit
+import multiprocessing
+import sys
+from multiprocessing import shared_memory
+
+import numpy
+
+from Lab1_PointLocalization_Chains.file_utils import index_arrays, index_layout
+from Lab1_PointLocalization_Chains.main import chain_tree_from_file
+
+# query points per task handed to a worker
+BATCH_SIZE = 1 << 14
+
+# the locator of a worker process, views of the shared memory block it keeps open
+worker_memory = None
+worker_locator = None
+
+
+def attach(name, entries, locator_type):
+    # pool initializer: map the block and make the locator of its arrays, nothing is copied
+    global worker_memory, worker_locator
+
+    # the pool's processes share the server's resource tracker, the block stays registered once and is
+    # unlinked by the server alone
+    worker_memory = shared_memory.SharedMemory(name)
+    worker_locator = locator_type.from_arrays(index_arrays(worker_memory.buf, entries))
+    atexit.register(detach)
+
+
+def detach():
+    # the block can only be closed once no array views it
+    global worker_memory, worker_locator
+
+    worker_locator = None
+    worker_memory.close()
+    worker_memory = None
+
+
+def locate_batch(points):
+    return worker_locator.locate_many(points)
+
+
+class QueryServer:
+    # Locator.locate_many over a pool of processes. The arrays of the locator (a ChainTree, a SlabTree) are
+    # copied once into a shared memory block, laid out as in an index file, and every worker maps that block
+    # when it starts; tasks carry only query points and their locations, the subdivision is never pickled.
+    def __init__(self, locator, processes=None, batch_size=BATCH_SIZE):
+        arrays = {name: numpy.ascontiguousarray(getattr(locator, name)) for name in locator.FIELDS}
+        entries, size = index_layout(arrays)
+
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        for name, view in index_arrays(self.memory.buf, entries).items():
+            view[...] = arrays[name]
+        # the views above are gone, the block can be closed later
+
+        self.batch_size = batch_size
+        self.pool = multiprocessing.Pool(processes, initializer=attach,
+                                         initargs=(self.memory.name, entries, type(locator)))
+
+    def locate_many(self, points):
+        # Locator.locate_many, the points split into batches that the workers answer in parallel
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+        if not len(points):
+            return numpy.empty((0, 2), dtype=numpy.int64)
+
+        batches = [points[start:start + self.batch_size] for start in range(0, len(points), self.batch_size)]
+        return numpy.concatenate(self.pool.map(locate_batch, batches))
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+if __name__ == "__main__":
+    # python query_server.py graph.txt queries.txt [--cache] [--processes=N], one "x y" query point per line;
+    # --cache as in main.py, N defaults to the number of cores
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+    options = dict(argument[2:].partition("=")[::2] for argument in sys.argv[1:] if argument.startswith("--"))
+
+    chain_tree = chain_tree_from_file(arguments[0], cache="cache" in options)
+    queries = numpy.loadtxt(arguments[1], ndmin=2)
+
+    with QueryServer(chain_tree, int(options["processes"]) if options.get("processes") else None) as server:
+        for (x, y), (left, right) in zip(queries.tolist(), server.locate_many(queries).tolist()):
+            print(f"({x}; {y}): between chains {left} and {right}")
@@ -0,0 +1,185 @@
+from bisect import bisect_right
+
+import numpy
+
+from GeometryKernel.predicates import ORIENTATION_FILTER, orientation
+from GeometryKernel.vectorized import orientations
+from Lab1_PointLocalization_Chains.locator import Locator
+
+
+def version_nodes(keys, nodes, targets, versions_count):
+    # for keys position * versions_count + version, sorted, and their nodes: the node of every target key,
+    # the one last made at its position up to its version, 0 (the empty tree) if there is none
+    if not len(keys):
+        return numpy.zeros(len(targets), dtype=numpy.int32)
+
+    found = numpy.maximum(numpy.searchsorted(keys, targets, side="right") - 1, 0)
+    same_position = keys[found] // versions_count == targets // versions_count
+    return numpy.where(same_position & (keys[found] <= targets), nodes[found], 0).astype(numpy.int32)
+
+
+class SlabTree(Locator):
+    # Persistent slabs. The distinct vertex ys cut the subdivision into slabs; inside one, every chain runs
+    # along a single edge and those edges, ordered by their first chain, partition the chains. From one slab
+    # to the next only the edges ending and starting on the boundary change, so the slabs are versions of one
+    # segment tree over the chains, with path copying: leaf c holds the edge whose first chain is c, a node
+    # the edge of its subtree with the highest first chain. A query takes the version of its slab and walks
+    # a single path: O(log n) orientations and no inner search, for O(E log n) nodes.
+    #
+    # On a boundary y the slab above it counts and on the top one the slab below it, the edges arriving
+    # there; that is the edge of every chain at y ChainIndex and ChainTree test, their answers are these.
+    FIELDS = ("roots", "left", "right", "node_edges", "slab_y", "lower_x", "lower_y", "upper_x", "upper_y",
+              "first", "sizes")
+
+    def __init__(self, graph):
+        # graph is a Graph or an ArrayGraph
+        lower, upper, first, last = graph.chain_edge_arrays()
+        x, y = graph.coordinates()
+
+        count = int(last.max()) + 1 if len(last) else 0
+        # the number of chains, as an array like everything the tree is made of
+        self.sizes = numpy.array([count], dtype=numpy.int64)
+        self.slab_y = numpy.unique(y)
+        self.lower_x, self.lower_y = x[lower], y[lower]
+        self.upper_x, self.upper_y = x[upper], y[upper]
+        self.first = first
+
+        # (version, leaf, edge) changes: an edge enters with the slab of its lower end and leaves (-1) with
+        # that of its upper end, except on the top boundary, whose version stays the last slab's; an edge
+        # entering a leaf wins over one leaving it
+        versions_count = len(self.slab_y)
+        lower_version = numpy.searchsorted(self.slab_y, self.lower_y)
+        upper_version = numpy.searchsorted(self.slab_y, self.upper_y)
+        spans = numpy.flatnonzero(lower_version < upper_version)
+        leaving = spans[upper_version[spans] < versions_count - 1]
+
+        versions = numpy.concatenate((lower_version[spans], upper_version[leaving]))
+        positions = numpy.concatenate((first[spans], first[leaving]))
+        values = numpy.concatenate((spans, numpy.full(len(leaving), -1)))
+
+        order = numpy.lexsort((-values, versions, positions))
+        positions, versions, values = positions[order], versions[order], values[order]
+        keys = positions * versions_count + versions
+        distinct = numpy.flatnonzero(numpy.concatenate(([True], keys[1:] != keys[:-1])))
+        positions, versions, values, keys = positions[distinct], versions[distinct], values[distinct], keys[distinct]
+
+        # node 0 is the empty tree, its children are itself; every other node is made once, level by level
+        # from the leaves up, for every version in which something below it changes
+        left = [numpy.zeros(1, dtype=numpy.int32)]
+        right = [numpy.zeros(1, dtype=numpy.int32)]
+        node_edges = [numpy.full(1, -1, dtype=numpy.int32)]
+        size = 1
+
+        def add_nodes(left_children, right_children, edges):
+            nonlocal size
+            filled = edges >= 0
+            nodes = numpy.zeros(len(edges), dtype=numpy.int32)
+            nodes[filled] = numpy.arange(size, size + int(filled.sum()), dtype=numpy.int32)
+            left.append(left_children[filled])
+            right.append(right_children[filled])
+            node_edges.append(edges[filled].astype(numpy.int32))
+            size += int(filled.sum())
+            return nodes
+
+        no_children = numpy.zeros(len(values), dtype=numpy.int32)
+        nodes = add_nodes(no_children, no_children, values)
+
+        for _ in range(max(count - 1, 0).bit_length()):
+            parent_keys = numpy.unique((positions >> 1) * versions_count + versions)
+            parent_positions, parent_versions = parent_keys // versions_count, parent_keys % versions_count
+
+            left_children = version_nodes(keys, nodes, 2 * parent_positions * versions_count + parent_versions,
+                                          versions_count)
+            right_children = version_nodes(keys, nodes, (2 * parent_positions + 1) * versions_count + parent_versions,
+                                           versions_count)
+
+            edges = numpy.concatenate(node_edges)
+            right_edges = edges[right_children]
+            nodes = add_nodes(left_children, right_children,
+                              numpy.where(right_edges >= 0, right_edges, edges[left_children]))
+            positions, versions, keys = parent_positions, parent_versions, parent_keys
+
+        self.left, self.right = numpy.concatenate(left), numpy.concatenate(right)
+        self.node_edges = numpy.concatenate(node_edges)
+        # the root of every version, the last one made at or before it; the keys are at position 0 by now
+        self.roots = version_nodes(keys, nodes, numpy.arange(versions_count), versions_count)
+        self.unpack()
+
+    def unpack(self):
+        self.count = int(self.sizes[0])
+        self.depth = max(self.count - 1, 0).bit_length()
+        self.y_min, self.y_max = (float(self.slab_y[0]), float(self.slab_y[-1])) if len(self.slab_y) else (0.0, 0.0)
+
+        # single queries read Python lists, made by the first one as in ChainTree
+        self.lists = None
+
+    def make_lists(self):
+        self.lists = (self.slab_y.tolist(), self.roots.tolist(), self.left.tolist(), self.right.tolist(),
+                      self.node_edges.tolist(), self.lower_x.tolist(), self.lower_y.tolist(), self.upper_x.tolist(),
+                      self.upper_y.tolist(), self.first.tolist())
+        # the largest absolute edge coordinate, for the semi-static orientation filter of locate
+        self.magnitude = max((float(abs(values).max()) for values in (self.lower_x, self.lower_y, self.upper_x,
+                                                                       self.upper_y) if len(values)), default=0.0)
+
+    def __len__(self):
+        return self.count
+
+    def locate(self, x, y):
+        # (left, right) chain indices around the point, as ChainTree.locate
+        if not self.count or not self.y_min <= y <= self.y_max:
+            return None, None
+        if self.lists is None:
+            self.make_lists()
+        slab_y, roots, left, right, node_edges, lower_x, lower_y, upper_x, upper_y, first = self.lists
+        magnitude = max(self.magnitude, abs(x), abs(y))
+        high = ORIENTATION_FILTER * magnitude * magnitude
+
+        # the edge of the lowest chain the point is left of: when it is left of the last edge of the left
+        # subtree the answer is in there, that edge if nothing before it. An edge carrying several chains
+        # leaves the leaves of its other chains empty, so it comes up again below and is not tested twice.
+        # Float turns beyond high decide a test, the others are passed to the adaptive predicate.
+        node = roots[bisect_right(slab_y, y) - 1]
+        found = -1
+        for level in range(self.depth + 1):
+            # the last edge of the left subtree, at the leaf the leaf's own edge
+            child = left[node] if level < self.depth else node
+            edge = node_edges[child]
+            if edge >= 0 and edge != found:
+                ax, ay, bx, by = lower_x[edge], lower_y[edge], upper_x[edge], upper_y[edge]
+                determinant = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+                if determinant > high or (determinant >= -high and orientation(ax, ay, bx, by, x, y) >= 0):
+                    found = edge
+            if level < self.depth:
+                node = child if edge >= 0 and edge == found else right[node]
+
+        lo = first[found] if found >= 0 else self.count
+        return lo - 1 if lo > 0 else None, lo if lo < self.count else None
+
+    def locate_many(self, points):
+        # locate for an (n, 2) array of points, -1 for None; all of them walk down level by level together
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+
+        inside = numpy.flatnonzero((y >= self.y_min) & (y <= self.y_max)) if self.count \
+            else numpy.empty(0, dtype=numpy.int64)
+        x, y = x[inside], y[inside]
+        nodes = self.roots[numpy.searchsorted(self.slab_y, y, side="right") - 1]
+        found = numpy.full(len(inside), -1, dtype=numpy.int32)
+
+        for level in range(self.depth + 1):
+            # the last edge of the left subtree, at the leaf the leaf's own edge
+            edges = self.node_edges[self.left[nodes] if level < self.depth else nodes]
+            filled = edges >= 0
+            tested = filled & (edges != found)
+            left_of = (filled & ~tested) | tested & (orientations(self.lower_x[edges], self.lower_y[edges],
+                                                                  self.upper_x[edges], self.upper_y[edges], x, y,
+                                                                  tested) >= 0)
+            found = numpy.where(left_of, edges, found)
+            if level < self.depth:
+                nodes = numpy.where(left_of, self.left[nodes], self.right[nodes])
+
+        lo = numpy.where(found >= 0, self.first[found], self.count)
+        location = numpy.full((len(points), 2), -1, dtype=numpy.int64)
+        location[inside, 0] = lo - 1
+        location[inside, 1] = numpy.where(lo < self.count, lo, -1)
+        return location
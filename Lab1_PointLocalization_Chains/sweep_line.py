@@ -0,0 +1,94 @@
+from GeometryKernel.concatenable_queue import ConcatenableQueue, EMPTY_QUEUE
+from GeometryKernel.predicates import ORIENTATION_FILTER, orientation
+
+
+class SweepLine:
+    # The edges of a Graph crossing a horizontal line that moves up through it, left to right. The line is
+    # at y when every vertex up to y is passed: an edge is on it while lower y <= y < upper y, so at a vertex's
+    # height it holds the edges leaving upwards and no longer those arriving, and horizontal edges never.
+    # Edges of a planar subdivision do not cross, so their order only changes at vertices: the edges arriving
+    # at a vertex are next to each other on the line and the ones leaving it take their place, in the order of
+    # the vertex's in and out lists. The line is a persistent balanced queue (GeometryKernel's
+    # ConcatenableQueue): passing a vertex is one search for its place, O(log E) orientations, and two splits
+    # and joins, O(log E) as well. Later vertices never change a queue, so the state at a vertex, snapshots(),
+    # can be kept for O(log E) new nodes each. Sorts the graph's vertices as find_chains does.
+    def __init__(self, graph):
+        graph.sort_vertices()
+        graph.prepare_in_out_lists()
+
+        self.vertices = graph.vertices
+        # edge ids on the line from left to right
+        self.active = EMPTY_QUEUE
+        self.y = float("-inf")
+        # the next vertex to pass
+        self.next_vertex = 0
+
+        # the largest absolute coordinate, for the semi-static orientation filter of position
+        self.magnitude = max((max(abs(vertex.x), abs(vertex.y)) for vertex in self.vertices), default=0.0)
+
+        # lower and upper vertex of every edge by edge id
+        self.lower = [None] * len(graph.edges)
+        self.upper = [None] * len(graph.edges)
+        for vertex in self.vertices:
+            for upper, edge in zip(vertex.out_list, vertex.out_edges):
+                self.lower[edge], self.upper[edge] = vertex, upper
+
+    def __len__(self):
+        return len(self.active)
+
+    def position(self, x, y):
+        # the place of (x, y) on the line: the first edge the point is left of or on, len(self) past them all
+        # float turns beyond high decide a test, the others are passed to the adaptive predicate
+        magnitude = max(self.magnitude, abs(x), abs(y))
+        high = ORIENTATION_FILTER * magnitude * magnitude
+        lower_vertices, upper_vertices = self.lower, self.upper
+
+        def left_of(edge, _):
+            lower, upper = lower_vertices[edge], upper_vertices[edge]
+            determinant = (upper.x - lower.x) * (y - lower.y) - (upper.y - lower.y) * (x - lower.x)
+            return determinant > high or (determinant >= -high and
+                                          orientation(lower.x, lower.y, upper.x, upper.y, x, y) >= 0)
+
+        return self.active.bisect(left_of)
+
+    def advance(self, y):
+        # moves the line up to y, passing every vertex at or below it
+        if y < self.y:
+            raise ValueError("the sweep line only moves up")
+
+        while self.next_vertex < len(self.vertices) and self.vertices[self.next_vertex].y <= y:
+            self.pass_vertex(self.vertices[self.next_vertex])
+            self.next_vertex += 1
+        self.y = y
+
+    def pass_vertex(self, vertex):
+        arriving = [edge for edge in vertex.in_edges if self.lower[edge].y != vertex.y]
+        leaving = [edge for edge in vertex.out_edges if self.upper[edge].y != vertex.y]
+
+        start = self.position(vertex.x, vertex.y)
+        left, rest = self.active.split(start)
+        self.active = left + ConcatenableQueue(leaving) + rest.split(len(arriving))[1]
+
+    def edges(self):
+        # edge ids on the line from left to right
+        return list(self.active)
+
+    def edges_between(self, x_min, x_max):
+        # the edge ids on the line crossing it at x_min <= x < x_max, O(log E + k)
+        return list(self.active[self.position(x_min, self.y):self.position(x_max, self.y)])
+
+    def edge_vertices(self, edge):
+        # (lower, upper) vertex of an edge
+        return self.lower[edge], self.upper[edge]
+
+    def snapshots(self):
+        # (y, the line's queue of edge ids) at the height of every vertex, bottom to top, the line moving with
+        # them; the queues stay as they are, O(1) to keep
+        while self.next_vertex < len(self.vertices):
+            self.advance(self.vertices[self.next_vertex].y)
+            yield self.y, self.active
+
+    def states(self):
+        # (y, edge ids left to right) at the height of every vertex, as snapshots() but as lists
+        for y, active in self.snapshots():
+            yield y, list(active)
@@ -0,0 +1,331 @@
+import math
+import os
+from fractions import Fraction
+
+import matplotlib.tri as mtri
+import numpy
+import pytest
+
+from GeometryKernel.predicates import exact_orientation
+from Lab1_PointLocalization_Chains.array_graph import ArrayGraph
+from Lab1_PointLocalization_Chains.chain_index import ChainIndex
+from Lab1_PointLocalization_Chains.chain_tree import ChainTree
+from Lab1_PointLocalization_Chains.dynamic import DynamicSubdivision
+from Lab1_PointLocalization_Chains.file_utils import read_graph_arrays
+from Lab1_PointLocalization_Chains.location_cache import LocationCache
+from Lab1_PointLocalization_Chains.main import Vertex, chain_tree_from_file, chains_magnitude, graph_from_arrays, \
+    point_localization
+from Lab1_PointLocalization_Chains.slab_tree import SlabTree
+from Lab1_PointLocalization_Chains.sweep_line import SweepLine
+
+# Brute force references: the chains as the original per vertex atan2 sort and dense weight balance found
+# them, a point's place by testing it against every chain in turn, the sweep line order by exact crossing
+# points. The structures are compared with those on small subdivisions, degenerate ones included.
+
+
+def delaunay(n, seed):
+    rng = numpy.random.default_rng(seed)
+    xs, ys = rng.random(n), rng.random(n)
+    return numpy.column_stack((xs, ys)), mtri.Triangulation(xs, ys).edges.astype(numpy.int64)
+
+
+def grid(k, seed):
+    # a k x k grid split into triangles by random diagonals: horizontal edges and collinear vertices
+    rng = numpy.random.default_rng(seed)
+    vertices = [(i, j) for j in range(k) for i in range(k)]
+    edges = []
+    for j in range(k):
+        for i in range(k):
+            v = j * k + i
+            if i + 1 < k:
+                edges.append((v, v + 1))
+            if j + 1 < k:
+                edges.append((v, v + k))
+            if i + 1 < k and j + 1 < k:
+                edges.append((v, v + k + 1) if rng.random() < 0.5 else (v + 1, v + k))
+    return numpy.array(vertices, dtype=numpy.float64), numpy.array(edges, dtype=numpy.int64)
+
+
+def input_graph():
+    vertices, edges, _ = read_graph_arrays(os.path.join(os.path.dirname(__file__), "input.txt"))
+    return vertices, edges
+
+
+def horizontal_rows():
+    # bottom and top rows of horizontal edges, points on them right of the last chain's end edges
+    vertices = numpy.array([[0, 2], [1, 0], [1, 1], [1, 2], [3, 0], [3, 2]], dtype=numpy.float64)
+    edges = numpy.array([[1, 0], [2, 0], [2, 1], [3, 0], [3, 2], [4, 1], [4, 2], [5, 2], [5, 3], [5, 4]])
+    return vertices, edges
+
+
+GRAPHS = {
+    "input": input_graph(),
+    "horizontal rows": horizontal_rows(),
+    "delaunay 40": delaunay(40, 0),
+    "delaunay 120": delaunay(120, 1),
+    "grid 4": grid(4, 2),
+    "grid 6": grid(6, 3),
+}
+
+
+@pytest.fixture(params=list(GRAPHS), ids=list(GRAPHS))
+def graph_arrays(request):
+    return GRAPHS[request.param]
+
+
+def baseline_chains(vertices, edges):
+    # the chains as vertex numbers, bottom to top vertex numbering
+    order = numpy.lexsort((vertices[:, 0], vertices[:, 1])).tolist()
+    numbers = {old: new for new, old in enumerate(order)}
+    points = [tuple(vertices[old]) for old in order]
+    neighbours = [[] for _ in points]
+    for first, second in edges.tolist():
+        neighbours[numbers[first]].append(numbers[second])
+        neighbours[numbers[second]].append(numbers[first])
+
+    def angle(vertex, neighbour):
+        return math.atan2(points[neighbour][1] - points[vertex][1], points[neighbour][0] - points[vertex][0])
+
+    in_lists = [sorted((u for u in neighbours[v] if u < v), key=lambda u: angle(v, u)) for v in range(len(points))]
+    out_lists = [sorted((u for u in neighbours[v] if u > v), key=lambda u: -angle(v, u)) for v in range(len(points))]
+
+    weights = {(min(v, u), max(v, u)): 1 for v in range(len(points)) for u in neighbours[v]}
+    for v in range(1, len(points) - 1):
+        w_in = sum(weights[u, v] for u in in_lists[v])
+        w_out = sum(weights[v, u] for u in out_lists[v])
+        if w_in > w_out:
+            weights[v, out_lists[v][0]] += w_in - w_out
+    for v in range(len(points) - 1, 0, -1):
+        w_in = sum(weights[u, v] for u in in_lists[v])
+        w_out = sum(weights[v, u] for u in out_lists[v])
+        if w_out > w_in:
+            weights[in_lists[v][0], v] += w_out - w_in
+
+    chains = []
+    for _ in range(sum(weights[0, u] for u in out_lists[0])):
+        chain, v = [0], 0
+        while v != len(points) - 1:
+            u = next(u for u in out_lists[v] if weights[v, u] > 0)
+            weights[v, u] -= 1
+            chain.append(u)
+            v = u
+        chains.append(chain)
+    return chains
+
+
+def brute_locate(chains, x, y):
+    # (left, right) by testing the point against every chain, each one's edge at y leaving it upwards or on
+    # the top row arriving there; None past the outer chains and for points outside the chains' y range
+    if not chains or not chains[0][0].y <= y <= chains[0][-1].y:
+        return None, None
+    for number, chain in enumerate(chains):
+        if y == chain[-1].y:
+            lower = max(k for k in range(len(chain) - 1) if chain[k].y < y)
+        else:
+            lower = max(k for k in range(len(chain) - 1) if chain[k].y <= y)
+        a, b = chain[lower], chain[lower + 1]
+        if exact_orientation(a.x, a.y, b.x, b.y, x, y) >= 0:
+            return number - 1 if number > 0 else None, number
+    return len(chains) - 1, None
+
+
+def probe_points(vertices, edges, seed):
+    # random points around the subdivision, its vertices and points next to them, points on edges and on
+    # the bottom and top rows
+    rng = numpy.random.default_rng(seed)
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    span = high - low
+    random_points = rng.uniform(low - span / 4, high + span / 4, (200, 2))
+    on_edges = vertices[edges[:, 0]] + (vertices[edges[:, 1]] - vertices[edges[:, 0]]) * rng.random((len(edges), 1))
+    shifted = vertices + [span[0] / 7, 0]
+    rows = numpy.column_stack((rng.uniform(low[0] - span[0], high[0] + span[0], 40),
+                               numpy.repeat([low[1], high[1]], 20)))
+    return numpy.concatenate((random_points, vertices, shifted, on_edges, rows))
+
+
+def as_array(locations):
+    return numpy.array([[-1 if chain is None else chain for chain in location] for location in locations],
+                       dtype=numpy.int64).reshape(-1, 2)
+
+
+def test_find_chains_matches_baseline(graph_arrays):
+    vertices, edges = graph_arrays
+    expected = baseline_chains(vertices, edges)
+
+    chains = graph_from_arrays(vertices, edges).find_chains()
+    assert [[vertex.n for vertex in chain] for chain in chains] == expected
+    assert [chain.tolist() for chain in ArrayGraph(vertices, edges).find_chains()] == expected
+
+
+def test_locators_match_brute_force(graph_arrays):
+    vertices, edges = graph_arrays
+    graph = graph_from_arrays(vertices, edges)
+    chains = graph.find_chains()
+    points = probe_points(vertices, edges, 0)
+    expected = as_array([brute_locate(chains, x, y) for x, y in points.tolist()])
+
+    index = ChainIndex(chains)
+    array_graph = ArrayGraph(vertices, edges)
+    array_chains = array_graph.find_chains()
+    for locator in (index, ChainIndex(array_chains, array_graph.x, array_graph.y), ChainTree(graph),
+                    ChainTree(array_graph), SlabTree(graph), SlabTree(array_graph)):
+        assert numpy.array_equal(as_array([locator.locate(x, y) for x, y in points.tolist()]), expected)
+        assert numpy.array_equal(locator.locate_many(points), expected)
+
+    located = [point_localization(chains, Vertex(x, y, -1)) for x, y in points.tolist()]
+    assert located == [index.locate_chains(Vertex(x, y, -1)) for x, y in points.tolist()]
+    assert chains_magnitude(chains) == index.magnitude
+    magnitude = chains_magnitude(chains)
+    assert [point_localization(chains, Vertex(x, y, -1), magnitude=magnitude) for x, y in points.tolist()] == located
+
+
+def test_top_and_bottom_rows():
+    # horizontal edges on the outer rows: the chains' edges there are the ones leaving the bottom row and
+    # arriving at the top row, in every locator
+    vertices, edges = horizontal_rows()
+    graph = ArrayGraph(vertices, edges)
+    for locator in (ChainTree(graph), SlabTree(graph)):
+        assert locator.locate(3.5, 2.0) == (4, None)
+        assert locator.locate(0.5, 2.0) == (1, 2)
+        assert locator.locate(-1.0, 2.0) == (None, 0)
+        assert locator.locate(2.0, 0.0) == (2, 3)
+
+    for seed in range(30):
+        vertices, edges = grid(4, seed)
+        graph = ArrayGraph(vertices, edges)
+        rng = numpy.random.default_rng(seed)
+        points = numpy.column_stack((rng.uniform(-1.0, 4.0, 40), numpy.repeat([0.0, 3.0], 20)))
+        points = numpy.concatenate((points, numpy.column_stack((points[:, 0].round(), points[:, 1]))))
+        locations = [locator.locate_many(points) for locator in (ChainTree(graph), SlabTree(graph))]
+        locations.append(ChainIndex(graph.find_chains(), graph.x, graph.y).locate_many(points))
+        assert all(numpy.array_equal(locations[0], other) for other in locations[1:])
+
+
+def test_dynamic_updates():
+    # edges taken out of a triangulation and put back, then a vertex in some of its triangles; every state
+    # must be a valid decomposition, the one its chains give, and the ids must keep naming the same vertices
+    rng = numpy.random.default_rng(0)
+    xs, ys = rng.random(80), rng.random(80)
+    triangulation = mtri.Triangulation(xs, ys)
+    vertices, edges = numpy.column_stack((xs, ys)), triangulation.edges.astype(numpy.int64)
+
+    # leave every vertex an edge below and one above
+    order = numpy.lexsort((xs, ys))
+    ranks = numpy.empty(len(order), dtype=numpy.int64)
+    ranks[order] = numpy.arange(len(order))
+    lower, upper = ranks[edges].min(axis=1), ranks[edges].max(axis=1)
+    out_counts, in_counts = numpy.bincount(lower, minlength=len(xs)), numpy.bincount(upper, minlength=len(xs))
+    removed = []
+    for edge in rng.permutation(len(edges))[:len(edges) // 5].tolist():
+        if out_counts[lower[edge]] > 1 and in_counts[upper[edge]] > 1:
+            out_counts[lower[edge]] -= 1
+            in_counts[upper[edge]] -= 1
+            removed.append(edge)
+    kept = numpy.setdiff1d(numpy.arange(len(edges)), removed)
+
+    def check(subdivision, coordinates):
+        graph = subdivision.graph
+        assert numpy.array_equal(numpy.column_stack((graph.x, graph.y))[subdivision.numbers], coordinates)
+        chains = [[Vertex(graph.x[v], graph.y[v], v) for v in chain.tolist()] for chain in graph.find_chains()]
+        points = probe_points(coordinates, edges, 1)
+        expected = as_array([brute_locate(chains, x, y) for x, y in points.tolist()])
+        assert numpy.array_equal(subdivision.locate_many(points), expected)
+        assert numpy.array_equal(as_array([subdivision.locate(x, y) for x, y in points.tolist()]), expected)
+
+    for locator_type in (ChainTree, SlabTree):
+        subdivision = DynamicSubdivision(ArrayGraph(vertices, edges[kept]), locator_type)
+        check(subdivision, vertices)
+
+        subdivision.update(edges=edges[removed])
+        check(subdivision, vertices)
+
+        corners = triangulation.triangles[rng.choice(len(triangulation.triangles), 10, replace=False)]
+        centres = vertices[corners].mean(axis=1)
+        ids = len(vertices) + numpy.arange(len(corners))
+        subdivision.update(centres, numpy.concatenate([numpy.column_stack((corners[:, k], ids)) for k in range(3)]))
+        check(subdivision, numpy.concatenate((vertices, centres)))
+
+        # a vertex with no edge above it
+        state = subdivision.state
+        with pytest.raises(ValueError):
+            subdivision.update([[0.5, 2.0]], [[0, len(vertices) + len(corners)]])
+        assert subdivision.state is state
+
+
+def test_location_cache_across_updates():
+    # answers of the locator there is now, counters that keep counting when an update swaps it
+    vertices, edges = delaunay(60, 4)
+    subdivision = DynamicSubdivision(ArrayGraph(vertices, edges))
+    cache = LocationCache(subdivision, capacity=20)
+    points = numpy.random.default_rng(0).random((30, 2)).tolist()
+
+    for _ in range(2):
+        assert [cache.locate(x, y) for x, y in points] == [subdivision.locate(x, y) for x, y in points]
+    hits, misses = cache.hits, cache.misses
+    assert hits + misses == 60 and len(cache) == 20
+
+    # an update without changes still swaps in a new locator
+    subdivision.update()
+    assert [cache.locate(x, y) for x, y in points] == [subdivision.locate(x, y) for x, y in points]
+    assert cache.misses == misses + 30 and cache.hits == hits
+
+    cache.clear()
+    assert cache.hits == cache.misses == len(cache) == 0
+
+
+def test_sweep_line_order(graph_arrays):
+    vertices, edges = graph_arrays
+    graph = graph_from_arrays(vertices, edges)
+    sweep_line = SweepLine(graph)
+    lower, upper = sweep_line.lower, sweep_line.upper
+
+    def crossing(edge, y):
+        # exact x on the line and inverse slope, which orders edges through one point just above it
+        a, b = lower[edge], upper[edge]
+        inverse_slope = (Fraction(b.x) - Fraction(a.x)) / (Fraction(b.y) - Fraction(a.y))
+        return Fraction(a.x) + (Fraction(y) - Fraction(a.y)) * inverse_slope, inverse_slope
+
+    ys = sorted({vertex.y for vertex in graph.vertices})
+    rng = numpy.random.default_rng(0)
+    heights = sorted(ys + rng.uniform(ys[0], ys[-1], 20).tolist())
+    states = []
+    for y in heights:
+        sweep_line.advance(y)
+        expected = sorted((edge for edge in range(len(graph.edges)) if lower[edge].y <= y < upper[edge].y),
+                          key=lambda edge: crossing(edge, y))
+        assert sweep_line.edges() == expected
+        states.append((sweep_line.active, expected))
+
+        # the edges crossing a range of x, bounded by the crossings of two of them and by random values
+        if expected:
+            x_min, x_max = sorted(float(crossing(rng.choice(expected), y)[0]) for _ in range(2))
+            for bounds in ((x_min, x_max), tuple(sorted(rng.uniform(x_min - 1, x_max + 1, 2).tolist()))):
+                assert sweep_line.edges_between(*bounds) == \
+                    [edge for edge in expected if bounds[0] <= crossing(edge, y)[0] < bounds[1]]
+
+    # later vertices leave the queues of earlier states as they were
+    assert [list(active) for active, _ in states] == [expected for _, expected in states]
+
+    # get_edges_at_y answers from the states of one sweep, below and above the graph as well
+    other = graph_from_arrays(vertices, edges)
+    for y in [ys[0] - 1] + heights + [ys[-1] + 1]:
+        expected = sorted((edge for edge in range(len(graph.edges)) if lower[edge].y <= y < upper[edge].y),
+                          key=lambda edge: crossing(edge, y))
+        assert [[a.n, b.n] for a, b in other.get_edges_at_y(y)] == [[lower[edge].n, upper[edge].n]
+                                                                    for edge in expected]
+
+
+def test_chain_tree_from_file(tmp_path, graph_arrays):
+    # built from the file's arrays, then mapped from the index file, the same tree as from the Graph
+    vertices, edges = graph_arrays
+    path = str(tmp_path / "graph.txt")
+    with open(path, "w") as file:
+        file.write(f"{len(vertices)}\n{len(edges)}\n")
+        file.writelines(f"{x!r} {y!r}\n" for x, y in vertices.tolist())
+        file.writelines(f"{first} {second}\n" for first, second in edges.tolist())
+
+    expected = ChainTree(graph_from_arrays(vertices, edges))
+    for _ in range(2):
+        chain_tree = chain_tree_from_file(path, cache=True)
+        for name in ChainTree.FIELDS:
+            assert numpy.array_equal(getattr(chain_tree, name), getattr(expected, name))
@@ -0,0 +1,180 @@
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from GeometryKernel.concatenable_queue import ConcatenableQueue
+from Lab2_ConvexHullDynamicSupport.bridges import chain_coordinates, find_bridges
+from Lab2_ConvexHullDynamicSupport.convex_hull import ConvexHull
+from Lab2_ConvexHullDynamicSupport.point import Point
+from Lab2_ConvexHullDynamicSupport.rb_tree import RedBlackTree, find_bridge
+
+
+def generate_points(n, order):
+    points = [Point(float(x), random.uniform(-n, n)) for x in range(n)]
+
+    if order == "reverse":
+        points.reverse()
+    elif order == "random":
+        random.shuffle(points)
+
+    return points
+
+
+def max_height(n):
+    # n leaves hang under n - 1 red-black internal nodes
+    return 2 * math.log2(n + 1) + 1
+
+
+def depth_benchmark(n):
+    for order in ["sorted", "reverse", "random"]:
+        points = generate_points(n, order)
+        tree = RedBlackTree()
+
+        start = time.perf_counter()
+        for point in points:
+            tree.insert(point)
+        insert_time = time.perf_counter() - start
+
+        height = tree.height()
+        assert height <= max_height(n), f"{order}: height {height} after {n} inserts"
+
+        start = time.perf_counter()
+        for point in points[:n // 2]:
+            tree.delete(point)
+        delete_time = time.perf_counter() - start
+
+        height_after_delete = tree.height()
+        assert height_after_delete <= max_height(n - n // 2), \
+            f"{order}: height {height_after_delete} after {n // 2} deletes"
+
+        print(f"{order:>8}: n = {n}, height = {height} (bound {max_height(n):.1f}), "
+              f"insert {insert_time:.3f} s, height after deleting half = {height_after_delete}, "
+              f"delete {delete_time:.3f} s")
+
+
+def convex_position_benchmark(n):
+    # every point lies on the upper hull, so the chains kept in the tree are as long as possible
+    points = [Point(float(x), -float(x) ** 2) for x in range(n)]
+    random.shuffle(points)
+    tree = RedBlackTree()
+
+    start = time.perf_counter()
+    for point in points:
+        tree.insert(point)
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for point in points:
+        tree.delete(point)
+    delete_time = time.perf_counter() - start
+
+    print(f"  convex: n = {n}, insert {insert_time:.3f} s, delete {delete_time:.3f} s")
+
+
+def build_benchmark(n):
+    coordinates = [(random.uniform(-n, n), random.uniform(-n, n)) for _ in range(n)]
+    points = [Point(x, y) for x, y in coordinates]
+
+    start = time.perf_counter()
+    ConvexHull.from_points(points)
+    build_time = time.perf_counter() - start
+
+    array = np.array(coordinates)
+    start = time.perf_counter()
+    ConvexHull.from_points(array)
+    array_build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    convex_hull = ConvexHull()
+    for point in points:
+        convex_hull.insert(point)
+    insert_time = time.perf_counter() - start
+
+    print(f"   build: n = {n}, from_points {build_time:.3f} s, from an array {array_build_time:.3f} s, "
+          f"one by one {insert_time:.3f} s")
+
+
+def query_benchmark(n, queries=10 ** 5):
+    # points on a circle keep all of them on the hull, so the chains are as long as possible
+    points = [Point(n * math.cos(angle), n * math.sin(angle))
+              for angle in (random.uniform(0, 2 * math.pi) for _ in range(n))]
+    convex_hull = ConvexHull.from_points(points)
+    query_points = [Point(random.uniform(-2 * n, 2 * n), random.uniform(-2 * n, 2 * n), to_delete=True)
+                    for _ in range(queries)]
+    directions = [(random.uniform(-1, 1), random.uniform(-1, 1)) for _ in range(queries)]
+
+    start = time.perf_counter()
+    for point in query_points:
+        convex_hull.contains(point)
+    contains_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for direction in directions:
+        convex_hull.extreme_point(direction)
+    extreme_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for point in query_points:
+        convex_hull.tangents(point)
+    tangents_time = time.perf_counter() - start
+
+    print(f"   query: n = {n}, {convex_hull.vertex_count()} vertices, per query: "
+          f"contains {contains_time / queries * 1e6:.1f} us, extreme_point {extreme_time / queries * 1e6:.1f} us, "
+          f"tangents {tangents_time / queries * 1e6:.1f} us")
+
+
+def convex_chain(n, start, stop):
+    # n points of the parabola y = -x^2 with start <= x < stop, an upper hull by itself
+    return ConcatenableQueue(Point(x, -x * x) for x in sorted(random.uniform(start, stop) for _ in range(n)))
+
+
+def bridge_benchmark(n, pairs=1000):
+    chains_1 = [convex_chain(n, random.uniform(-2, -1), random.uniform(-1, 0)) for _ in range(pairs)]
+    chains_2 = [convex_chain(n, random.uniform(0, 1), random.uniform(1, 2)) for _ in range(pairs)]
+
+    start = time.perf_counter()
+    bridges = [find_bridge(chain_1, chain_2) for chain_1, chain_2 in zip(chains_1, chains_2)]
+    scalar_time = time.perf_counter() - start
+
+    coordinates_1 = chain_coordinates(chains_1)
+    coordinates_2 = chain_coordinates(chains_2)
+
+    start = time.perf_counter()
+    indices_1, indices_2 = find_bridges(coordinates_1, coordinates_2)
+    batch_time = time.perf_counter() - start
+
+    assert bridges == list(zip(indices_1.tolist(), indices_2.tolist()))
+    print(f"  bridge: {pairs} pairs of {n} point chains, find_bridge {scalar_time:.3f} s, "
+          f"find_bridges {batch_time:.3f} s")
+
+
+def memory_benchmark(n):
+    tracemalloc.start()
+
+    points = [Point(random.uniform(-n, n), random.uniform(-n, n)) for _ in range(n)]
+    points_memory = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    convex_hull = ConvexHull.from_points(points)
+    build_time = time.perf_counter() - start
+    hull_memory = tracemalloc.get_traced_memory()[0] - points_memory
+
+    tracemalloc.stop()
+    print(f"  memory: n = {n}, points {points_memory / n:.0f} B/point, "
+          f"hull trees {hull_memory / n:.0f} B/point, from_points {build_time:.3f} s")
+    return convex_hull
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 4
+    depth_benchmark(size)
+    convex_position_benchmark(size)
+    build_benchmark(size)
+    query_benchmark(size)
+    bridge_benchmark(min(size, 10 ** 3))
+    memory_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 6)
@@ -0,0 +1,104 @@
+from itertools import chain
+
+import numpy as np
+
+from GeometryKernel.vectorized import intersection_sides, orientations
+
+# Batched bridge search for callers that already hold many chains as coordinate arrays. Flattening the
+# tree's queues into arrays costs more than the searches themselves, so the tree keeps to find_bridge.
+
+
+def chain_coordinates(chains):
+    # x, y of all chains one after another, where each chain starts and how long it is
+    lengths = np.fromiter(map(len, chains), dtype=np.int64, count=len(chains))
+    starts = np.zeros(len(chains), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    total = int(lengths.sum())
+    x = np.fromiter((point.x for point in chain.from_iterable(chains)), dtype=np.float64, count=total)
+    y = np.fromiter((point.y for point in chain.from_iterable(chains)), dtype=np.float64, count=total)
+
+    return x, y, starts, lengths
+
+
+def find_bridges(chains_1, chains_2, reverse=False):
+    # find_bridge for every pair of chains given as chain_coordinates, run in lock step with one vectorised
+    # step per iteration; the tests are decided the same way, so the bridges are the ones find_bridge finds
+    x_1, y_1, starts_1, lengths_1 = chains_1
+    x_2, y_2, starts_2, lengths_2 = chains_2
+
+    last_1 = starts_1 + lengths_1 - 1
+    max_left_x = x_1[last_1]
+    max_left_y = y_1[last_1]
+
+    temp_min_1 = np.zeros(len(lengths_1), dtype=np.int64)
+    temp_max_1 = lengths_1 - 1
+    temp_min_2 = np.zeros(len(lengths_2), dtype=np.int64)
+    temp_max_2 = lengths_2 - 1
+
+    bridges_1 = np.empty(len(lengths_1), dtype=np.int64)
+    bridges_2 = np.empty(len(lengths_2), dtype=np.int64)
+
+    active = np.arange(len(lengths_1))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        while len(active):
+            index_1 = (temp_min_1[active] + temp_max_1[active]) // 2
+            index_2 = (temp_min_2[active] + temp_max_2[active]) // 2
+
+            position_1 = starts_1[active] + index_1
+            position_2 = starts_2[active] + index_2
+            x1, y1 = x_1[position_1], y_1[position_1]
+            x2, y2 = x_2[position_2], y_2[position_2]
+
+            has_pred_1 = index_1 > 0
+            has_suc_1 = index_1 + 1 < lengths_1[active]
+            has_pred_2 = index_2 > 0
+            has_suc_2 = index_2 + 1 < lengths_2[active]
+
+            # neighbours past the ends of a chain read the point itself, the has_ masks discard them
+            pred_1 = position_1 - has_pred_1
+            suc_1 = position_1 + has_suc_1
+            pred_2 = position_2 - has_pred_2
+            suc_2 = position_2 + has_suc_2
+
+            x_pred_1, y_pred_1 = x_1[pred_1], y_1[pred_1]
+            x_suc_1, y_suc_1 = x_1[suc_1], y_1[suc_1]
+            x_pred_2, y_pred_2 = x_2[pred_2], y_2[pred_2]
+            x_suc_2, y_suc_2 = x_2[suc_2], y_2[suc_2]
+
+            convex_1 = has_pred_1 & (orientations(x1, y1, x2, y2, x_pred_1, y_pred_1, has_pred_1) >= 0)
+            concave_1 = ~convex_1 & has_suc_1 & (orientations(x1, y1, x2, y2, x_suc_1, y_suc_1,
+                                                              ~convex_1 & has_suc_1) > 0)
+            supporting_1 = ~convex_1 & ~concave_1
+
+            convex_2 = has_suc_2 & (orientations(x1, y1, x2, y2, x_suc_2, y_suc_2, has_suc_2) >= 0)
+            concave_2 = ~convex_2 & has_pred_2 & (orientations(x1, y1, x2, y2, x_pred_2, y_pred_2,
+                                                               ~convex_2 & has_pred_2) > 0)
+            supporting_2 = ~convex_2 & ~concave_2
+
+            done = supporting_1 & supporting_2
+            bridges_1[active[done]] = index_1[done]
+            bridges_2[active[done]] = index_2[done]
+
+            # both concave: which side of max_left do the lines through q1, q1_suc and q2_pred, q2 cross on
+            both_concave = concave_1 & concave_2
+            sides = intersection_sides(x1, y1, x_suc_1, y_suc_1, x_pred_2, y_pred_2, x2, y2,
+                                       max_left_x[active], max_left_y[active], both_concave)
+            max_left_precedes = sides < 0 if reverse else sides > 0
+
+            new_min_1 = np.where((supporting_2 & concave_1) | (both_concave & ~max_left_precedes),
+                                 index_1 + 1, temp_min_1[active])
+            new_max_1 = np.where(convex_1, index_1 - 1, np.where(supporting_1, index_1, temp_max_1[active]))
+            new_min_2 = np.where(convex_2, index_2 + 1, np.where(supporting_2, index_2, temp_min_2[active]))
+            new_max_2 = np.where((supporting_1 & concave_2) | (both_concave & max_left_precedes),
+                                 index_2 - 1, temp_max_2[active])
+
+            temp_min_1[active] = new_min_1
+            temp_max_1[active] = new_max_1
+            temp_min_2[active] = new_min_2
+            temp_max_2[active] = new_max_2
+
+            active = active[~done]
+
+    return bridges_1, bridges_2
@@ -1,6 +1,8 @@
-import copy
+import numpy as np
 
-from Lab2_ConvexHullDynamicSupport.rb_tree import RedBlackTree
+from GeometryKernel.predicates import orientation
+from Lab2_ConvexHullDynamicSupport.point import Point
+from Lab2_ConvexHullDynamicSupport.rb_tree import RedBlackTree, unique_sorted
 
 
 class ConvexHull:
@@ -8,6 +10,18 @@ class ConvexHull:
         self.upper_hull = UpperHull()
         self.lower_hull = LowerHull()
 
+    @staticmethod
+    def from_points(points):
+        # points are Points or an (n, 2) array of coordinates
+        convex_hull = ConvexHull()
+        convex_hull.build(sorted_points(points))
+        return convex_hull
+
+    def build(self, points):
+        # points sorted and free of duplicates; the lower tree walks the same Point objects backwards
+        self.upper_hull.build(points)
+        self.lower_hull.build(points[::-1])
+
     def insert(self, insert_point):
         self.upper_hull.insert(insert_point)
         self.lower_hull.insert(insert_point)
@@ -16,6 +30,75 @@ class ConvexHull:
         self.upper_hull.delete(delete_point)
         self.lower_hull.delete(delete_point)
 
+    def insert_many(self, insert_points):
+        insert_points = list(insert_points)
+
+        # rebuilding costs about as much as inserting as many points as the trees already hold; the points
+        # are sorted once for both trees, those already in them come first and win over equal new ones
+        if len(insert_points) >= self.upper_hull.bst.size:
+            self.build(unique_sorted(list(self.upper_hull.bst.points()) + insert_points))
+            return
+
+        for insert_point in insert_points:
+            self.insert(insert_point)
+
+    def delete_many(self, delete_points):
+        delete_points = list(delete_points)
+
+        if len(delete_points) >= self.upper_hull.bst.size // 2:
+            to_delete = {(point.x, point.y) for point in delete_points}
+            self.build([point for point in self.upper_hull.bst.points() if (point.x, point.y) not in to_delete])
+            return
+
+        for delete_point in delete_points:
+            self.delete(delete_point)
+
+    def vertex_count(self):
+        # both chains run from the left most to the right most point
+        upper_count = len(self.upper_hull.chain())
+        lower_count = len(self.lower_hull.chain())
+
+        return upper_count + lower_count - 2 if upper_count > 1 else upper_count
+
+    def contains(self, point):
+        # boundary included
+        return self.upper_hull.contains(point) and self.lower_hull.contains(point)
+
+    def extreme_point(self, direction):
+        dx, dy = direction
+        if dx == 0 and dy == 0:
+            raise ValueError("direction must not be zero")
+
+        if dy >= 0:
+            return self.upper_hull.extreme_point(dx, dy)
+        return self.lower_hull.extreme_point(dx, dy)
+
+    def tangents(self, point):
+        # (left, right) tangent points as seen from point, the hull lies to the right of the line from point
+        # through the left one and to the left of the line through the right one; None if point is not outside
+        if self.contains(point):
+            return None
+
+        candidates = self.upper_hull.tangent_candidates(point) + self.lower_hull.tangent_candidates(point)
+        if not candidates:
+            return None
+
+        # one semi-static bound for all tests, the candidates come from both trees
+        high = max(self.upper_hull.bst.filter_bound(point), self.lower_hull.bst.filter_bound(point))
+        x, y = point.x, point.y
+        left = right = candidates[0]
+        for candidate in candidates:
+            cx, cy = candidate.x, candidate.y
+            # candidate strictly right of left -> point, then of point -> right
+            determinant = (x - left.x) * (cy - left.y) - (y - left.y) * (cx - left.x)
+            if determinant < -high or (determinant <= high and orientation(left.x, left.y, x, y, cx, cy) < 0):
+                left = candidate
+            determinant = (right.x - x) * (cy - y) - (right.y - y) * (cx - x)
+            if determinant < -high or (determinant <= high and orientation(x, y, right.x, right.y, cx, cy) < 0):
+                right = candidate
+
+        return left, right
+
     def plot(self, fig, ax):
         self.upper_hull.plot(fig, ax)
         return self.lower_hull.plot(fig, ax)
@@ -25,31 +108,82 @@ class UpperHull:
     def __init__(self):
         self.bst = RedBlackTree()
 
+    def build(self, points):
+        # points sorted from left to right and free of duplicates
+        self.bst.build(points)
+
     def insert(self, insert_point):
         self.bst.insert(insert_point)
 
     def delete(self, delete_point):
         self.bst.delete(delete_point)
 
+    def insert_many(self, insert_points):
+        self.bst.insert_many(insert_points)
+
+    def delete_many(self, delete_points):
+        self.bst.delete_many(delete_points)
+
+    def chain(self):
+        return self.bst.chain()
+
+    def contains(self, point):
+        return self.bst.chain_contains(point)
+
+    def extreme_point(self, dx, dy):
+        return self.bst.chain_extreme(dx, dy)
+
+    def tangent_candidates(self, point):
+        return self.bst.tangent_candidates(point)
+
     def plot(self, fig, ax):
         return self.bst.plot(fig, ax)
 
 
 class LowerHull:
+    # shares the point objects with the upper hull, the tree just walks them from right to left
     def __init__(self):
-        self.bst = RedBlackTree()
+        self.bst = RedBlackTree(reverse=True)
 
-    def insert(self, insert_point):
-        to_insert = copy.deepcopy(insert_point)
-        to_insert.y *= -1
+    def build(self, points):
+        # points sorted from right to left and free of duplicates
+        self.bst.build(points)
 
-        self.bst.insert(to_insert)
+    def insert(self, insert_point):
+        self.bst.insert(insert_point)
 
     def delete(self, delete_point):
-        to_delete = copy.deepcopy(delete_point)
-        to_delete.y *= -1
+        self.bst.delete(delete_point)
+
+    def insert_many(self, insert_points):
+        self.bst.insert_many(insert_points)
+
+    def delete_many(self, delete_points):
+        self.bst.delete_many(delete_points)
+
+    def chain(self):
+        return self.bst.chain()
 
-        self.bst.delete(to_delete)
+    def contains(self, point):
+        return self.bst.chain_contains(point)
+
+    def extreme_point(self, dx, dy):
+        return self.bst.chain_extreme(dx, dy)
+
+    def tangent_candidates(self, point):
+        return self.bst.tangent_candidates(point)
 
     def plot(self, fig, ax):
-        return self.bst.plot(fig, ax, reverse=True)
+        return self.bst.plot(fig, ax)
+
+
+def sorted_points(points):
+    # Points sorted by x, then y, without duplicates. An array is sorted and deduplicated as it is, Point
+    # objects are only made for what is left of it.
+    if isinstance(points, np.ndarray):
+        points = points.reshape(-1, 2)
+        points = points[np.lexsort((points[:, 1], points[:, 0]))]
+        distinct = np.ones(len(points), dtype=bool)
+        distinct[1:] = np.any(points[1:] != points[:-1], axis=1)
+        return [Point(x, y) for x, y in points[distinct].tolist()]
+    return unique_sorted(points)
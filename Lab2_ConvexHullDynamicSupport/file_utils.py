@@ -1,4 +1,11 @@
+import math
+import os
+import sys
+import warnings
 from enum import Enum
+from itertools import groupby, islice
+
+import numpy as np
 
 from Lab2_ConvexHullDynamicSupport.point import Point
 
@@ -8,15 +15,177 @@ class OperationType(Enum):
     DELETE = 2
 
 
+OPERATION_CODES = {"i": OperationType.INSERT, "d": OperationType.DELETE}
+
+# lines parsed at once by the NumPy reader, also the largest batch handed to the hull
+CHUNK_SIZE = 1 << 16
+
+OPERATION_DTYPE = np.dtype([("operation", "U8"), ("x", "f8"), ("y", "f8")])
+
+# binary logs are this header followed by packed records, the operation byte holds OperationType.value
+BINARY_MAGIC = b"HULLOPS1"
+BINARY_DTYPE = np.dtype([("operation", "u1"), ("x", "<f8"), ("y", "<f8")])
+
+
+def parse_line(line):
+    # (operation type, coordinates), None for blank lines, comments and malformed rows
+    tokens = line.split("#", 1)[0].split()
+    if len(tokens) != 3 or tokens[0] not in OPERATION_CODES:
+        return None
+
+    try:
+        coordinates = (float(tokens[1]), float(tokens[2]))
+    except ValueError:
+        return None
+
+    if not math.isfinite(coordinates[0]) or not math.isfinite(coordinates[1]):
+        return None
+
+    return OPERATION_CODES[tokens[0]], coordinates
+
+
+def read_operations(path):
+    # deletions reuse the point object of the matching insertion
+    inserted_points = {}
+
+    with open(path) as file:
+        for line in file:
+            row = parse_line(line)
+            if row is None:
+                continue
+
+            operation_type, coordinates = row
+            if operation_type == OperationType.DELETE:
+                point = inserted_points.pop(coordinates, None)
+                if point is None:
+                    point = Point(*coordinates, to_delete=True)
+            else:
+                point = Point(*coordinates)
+                inserted_points[coordinates] = point
+
+            yield operation_type, point
+
+
 def points_from_file(path):
-    points_queue = []
+    return [[operation_type, point] for operation_type, point in read_operations(path)]
+
+
+def parse_chunk(lines):
+    # is_delete, x and y arrays of the well formed rows
+    try:
+        with warnings.catch_warnings():
+            # a chunk made of comments only is not worth a warning
+            warnings.simplefilter("ignore", UserWarning)
+            table = np.loadtxt(lines, dtype=OPERATION_DTYPE, comments="#", ndmin=1)
+    except ValueError:
+        # some row is malformed, only this chunk goes through the line by line parser
+        rows = [row for row in map(parse_line, lines) if row is not None]
+        is_delete = np.array([operation_type == OperationType.DELETE for operation_type, _ in rows], dtype=bool)
+        coordinates = np.array([coordinates for _, coordinates in rows], dtype=np.float64).reshape(-1, 2)
+        return is_delete, coordinates[:, 0], coordinates[:, 1]
+
+    operations = table["operation"]
+    is_delete = operations == "d"
+    valid = (is_delete | (operations == "i")) & np.isfinite(table["x"]) & np.isfinite(table["y"])
+
+    return is_delete[valid], table["x"][valid], table["y"][valid]
+
+
+def operation_runs(is_delete, x, y):
+    # (operation type, x, y) for every run of one operation type, the arrays are views
+    if not len(is_delete):
+        return
+
+    boundaries = (np.flatnonzero(is_delete[1:] != is_delete[:-1]) + 1).tolist()
+    for start, stop in zip([0] + boundaries, boundaries + [len(is_delete)]):
+        operation_type = OperationType.DELETE if is_delete[start] else OperationType.INSERT
+        yield operation_type, x[start:stop], y[start:stop]
 
+
+def read_operation_chunks(path, chunk_size=CHUNK_SIZE):
+    # runs of one operation type, at most chunk_size lines are held at a time
     with open(path) as file:
-        while line := file.readline().strip():
-            point_tokens = line.split(sep=" ")
-            operation_type = OperationType.DELETE if point_tokens[0] == "d" else OperationType.INSERT
+        while lines := list(islice(file, chunk_size)):
+            yield from operation_runs(*parse_chunk(lines))
+
+
+def is_binary_log(path):
+    with open(path, "rb") as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def convert_to_binary(text_path, binary_path, chunk_size=CHUNK_SIZE):
+    # returns the number of records written, rows the text readers skip are dropped
+    count = 0
+
+    with open(text_path) as text_file, open(binary_path, "wb") as binary_file:
+        binary_file.write(BINARY_MAGIC)
+
+        while lines := list(islice(text_file, chunk_size)):
+            is_delete, x, y = parse_chunk(lines)
+
+            records = np.empty(len(is_delete), dtype=BINARY_DTYPE)
+            records["operation"] = np.where(is_delete, OperationType.DELETE.value, OperationType.INSERT.value)
+            records["x"] = x
+            records["y"] = y
+            records.tofile(binary_file)
+            count += len(records)
+
+    return count
+
+
+def read_binary_log(path):
+    # the records of a binary log as a read only memory map, nothing is read until it is used
+    if not is_binary_log(path):
+        raise ValueError(f"{path} is not a binary operation log")
+
+    if os.path.getsize(path) == len(BINARY_MAGIC):
+        return np.empty(0, dtype=BINARY_DTYPE)
+
+    return np.memmap(path, dtype=BINARY_DTYPE, mode="r", offset=len(BINARY_MAGIC))
+
+
+def read_binary_operation_chunks(path, chunk_size=CHUNK_SIZE):
+    # the same runs as read_operation_chunks, sliced straight out of the memory map
+    records = read_binary_log(path)
+
+    for start in range(0, len(records), chunk_size):
+        # a plain ndarray view of the mapped pages, slicing a memmap per run is several times slower
+        chunk = np.asarray(records[start:start + chunk_size])
+        operations = chunk["operation"]
+        is_delete = operations == OperationType.DELETE.value
+
+        valid = is_delete | (operations == OperationType.INSERT.value)
+        if not valid.all():
+            chunk, is_delete = chunk[valid], is_delete[valid]
+
+        yield from operation_runs(is_delete, chunk["x"], chunk["y"])
+
+
+def apply_operations(convex_hull, operations, batch_size=CHUNK_SIZE):
+    # feeds (operation type, point) pairs to the hull in batches of one operation type
+    for operation_type, group in groupby(operations, key=lambda item: item[0]):
+        while batch := [point for _, point in islice(group, batch_size)]:
+            if operation_type == OperationType.INSERT:
+                convex_hull.insert_many(batch)
+            else:
+                convex_hull.delete_many(batch)
+
+    return convex_hull
+
+
+def apply_operation_chunks(convex_hull, chunks):
+    # deletions only need the coordinates, so they get fresh points here
+    for operation_type, x, y in chunks:
+        if operation_type == OperationType.INSERT:
+            convex_hull.insert_many([Point(point_x, point_y) for point_x, point_y in zip(x.tolist(), y.tolist())])
+        else:
+            convex_hull.delete_many([Point(point_x, point_y, to_delete=True)
+                                     for point_x, point_y in zip(x.tolist(), y.tolist())])
+
+    return convex_hull
 
-            to_delete = operation_type == OperationType.DELETE
-            points_queue.append([operation_type, Point(float(point_tokens[1]), float(point_tokens[2]), to_delete)])
 
-    return points_queue
+if __name__ == "__main__":
+    # python file_utils.py operations.txt operations.bin
+    print(f"{convert_to_binary(sys.argv[1], sys.argv[2])} operations written to {sys.argv[2]}")
@@ -1,19 +1,20 @@
 import sys
+
 import matplotlib.pyplot as plt
 
 from Lab2_ConvexHullDynamicSupport.convex_hull import ConvexHull
-from Lab2_ConvexHullDynamicSupport.file_utils import OperationType, points_from_file
+from Lab2_ConvexHullDynamicSupport.file_utils import apply_operation_chunks, apply_operations, is_binary_log, \
+    read_binary_operation_chunks, read_operation_chunks, read_operations
 
 if __name__ == "__main__":
-    points = points_from_file(sys.argv[1])
-
     convex_hull = ConvexHull()
 
-    for operation, point in points:
-        if operation == OperationType.INSERT:
-            convex_hull.insert(point)
-        if operation == OperationType.DELETE:
-            convex_hull.delete(point)
+    if is_binary_log(sys.argv[1]):
+        apply_operation_chunks(convex_hull, read_binary_operation_chunks(sys.argv[1]))
+    elif "--numpy" in sys.argv[2:]:
+        apply_operation_chunks(convex_hull, read_operation_chunks(sys.argv[1]))
+    else:
+        apply_operations(convex_hull, read_operations(sys.argv[1]))
 
     plt.style.use('ggplot')
     fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(10, 10))
@@ -2,6 +2,7 @@ from enum import Enum
 
 import numpy
 
+from GeometryKernel.concatenable_queue import ConcatenableQueue, EMPTY_QUEUE
 from Lab2_ConvexHullDynamicSupport.point import Point
 
 
@@ -17,14 +18,16 @@ class NodeSide(Enum):
 
 
 class NodeData:
+    __slots__ = ("left_most_right", "left_most_right_point", "points_array", "separating_index", "convex_hull",
+                 "graph_hull")
+
     def __init__(self, key=None):
         self.left_most_right: Node = None
         self.left_most_right_point: Point = key
-        self.points_array = []
+        self.points_array = EMPTY_QUEUE
         self.separating_index = 0
-        self.convex_hull = []
-        self.graph_hull = []
-        self.convex_hull.append(key)
+        self.convex_hull = ConcatenableQueue([key]) if key is not None else EMPTY_QUEUE
+        self.graph_hull = None  # only filled in while plotting
 
     def __lt__(self, other):
         return self.left_most_right_point < other.left_most_right_point
@@ -34,7 +37,7 @@ class NodeData:
 
 
 class Node:
-    i = 0
+    __slots__ = ("data", "parent", "left", "right", "color")
 
     def __init__(self, data):
         self.data: NodeData = data
@@ -42,24 +45,21 @@ class Node:
         self.left: Node = None
         self.right: Node = None
         self.color = NodeColor.RED
-        self.id = Node.i
-        Node.i += 1
 
     def __lt__(self, other):
         return self.data < other.data
 
     def __repr__(self):
-        return str(f"{self.id}: {self.data}")
+        # the object id keeps graph_viz labels unique without storing a counter in every node
+        return str(f"{id(self)}: {self.data}")
 
-    def plot(self, fig, ax, TNULL, reverse=False):
+    def plot(self, fig, ax, TNULL):
         if self is None or self == TNULL:
             return fig, ax
 
         if self.left == TNULL:
             _x, _y, _id = self.data.left_most_right_point.x, self.data.left_most_right_point.y, \
                           self.data.left_most_right_point.id
-            if reverse:
-                _y *= -1
             ax.scatter([_x], [_y], color="blue")
             ax.annotate(f"{_id}: ({_x}; {_y})", (_x, _y), xytext=(_x - 0.025, _y + 0.1))
             return fig, ax
@@ -70,10 +70,7 @@ class Node:
         color = numpy.random.rand(3, )
 
         for i in range(1, len(chain)):
-            if reverse:
-                ax.plot([chain[i - 1].x, chain[i].x], [-1 * chain[i - 1].y, -1 * chain[i].y], color=color)
-            else:
-                ax.plot([chain[i - 1].x, chain[i].x], [chain[i - 1].y, chain[i].y], color=color)
+            ax.plot([chain[i - 1].x, chain[i].x], [chain[i - 1].y, chain[i].y], color=color)
 
         if self.left != TNULL:
             self.left.data.graph_hull = chain[:self.data.separating_index + 1] + self.left.data.points_array
@@ -81,8 +78,14 @@ class Node:
         if self.right != TNULL:
             self.right.data.graph_hull = self.right.data.points_array + chain[self.data.separating_index + 1:]
 
-        self.left.plot(fig, ax, TNULL, reverse)
-        return self.right.plot(fig, ax, TNULL, reverse)
+        self.left.plot(fig, ax, TNULL)
+        return self.right.plot(fig, ax, TNULL)
+
+    def height(self, TNULL):
+        if self is None or self == TNULL:
+            return 0
+
+        return 1 + max(self.left.height(TNULL), self.right.height(TNULL))
 
     def node_side(self):
         if self.parent.left == self:
@@ -1,33 +1,42 @@
+from GeometryKernel.concatenable_queue import ConcatenableQueue, EMPTY_QUEUE
+from GeometryKernel.predicates import NO_BOUNDS, ORIENTATION_FILTER, filter_bounds, intersection_side, orientation
 from Lab2_ConvexHullDynamicSupport.node import Node, NodeData, NodeColor, NodeSide
-from Lab2_ConvexHullDynamicSupport.point import Point, PointClass, get_intersect_point, define_point_type_left, \
-    define_point_type_right, is_left
+from Lab2_ConvexHullDynamicSupport.point import Point, PointClass
 
 
 class RedBlackTree:
-    def __init__(self):
+    # Leaf-oriented tree: points live in the (always black) leaves, internal nodes route by
+    # left_most_right_point. Every node keeps the hull of its subtree as a persistent queue, which
+    # bridge() rebuilds whenever the subtree changes; points_array is the part of it that is not
+    # on the parent's hull.
+    #
+    # With reverse=True the points are ordered from right to left. The tree then keeps the lower hull:
+    # turning the plane by 180 degrees maps it onto an upper hull and leaves all orientation tests as they
+    # are, so both hulls can share the same point objects.
+    def __init__(self, reverse=False):
         self.TNULL = Node(NodeData())
         self.TNULL.color = NodeColor.BLACK
         self.TNULL.left = None
         self.TNULL.right = None
         self.root = self.TNULL
+        self.size = 0
+        self.reverse = reverse
+        # largest absolute coordinate of any point the tree has held and the float filter bounds it gives
+        self.magnitude = 0.0
+        self.bounds = filter_bounds(0.0)
 
     def left_rotate(self, x):
-        temp_array = x.data.points_array
-
         y = x.right
-        temp_j = x.data.separating_index + 1
-
-        x.data.points_array = x.right.data.points_array
-        x.right.data.points_array = temp_array
 
-        y.data.separating_index += temp_j
+        # y takes x's place, so it also takes the part of the parent's hull x was keeping
+        y.data.points_array = x.data.points_array
 
         x.right = y.left
         if y.left != self.TNULL:
             y.left.parent = x
 
         y.parent = x.parent
-        if x.parent is None:
+        if x.parent == self.TNULL:
             self.root = y
         elif x == x.parent.left:
             x.parent.left = y
@@ -36,23 +45,20 @@ class RedBlackTree:
         y.left = x
         x.parent = y
 
-    def right_rotate(self, x):
-        temp_array = x.data.points_array
+        self.bridge(x)
+        self.bridge(y)
 
+    def right_rotate(self, x):
         y = x.left
-        temp_j = y.data.separating_index + 1
 
-        x.data.points_array = x.left.data.points_array
-        x.left.data.points_array = temp_array
-
-        x.data.separating_index -= temp_j
+        y.data.points_array = x.data.points_array
 
         x.left = y.right
         if y.right != self.TNULL:
             y.right.parent = x
 
         y.parent = x.parent
-        if x.parent is None:
+        if x.parent == self.TNULL:
             self.root = y
         elif x == x.parent.right:
             x.parent.right = y
@@ -61,142 +67,143 @@ class RedBlackTree:
         y.right = x
         x.parent = y
 
-    def insert(self, key):
+        self.bridge(x)
+        self.bridge(y)
+
+    def precedes(self, point: Point, other: Point):
+        return other < point if self.reverse else point < other
+
+    def new_leaf(self, key):
+        magnitude = abs(key.x) if abs(key.x) > abs(key.y) else abs(key.y)
+        if magnitude > self.magnitude:
+            self.magnitude = magnitude
+            self.bounds = filter_bounds(magnitude)
         node = Node(NodeData(key))
-        node.parent = None
+        node.parent = self.TNULL
         node.data.left_most_right = node
         node.left = self.TNULL
         node.right = self.TNULL
-        node.color = NodeColor.RED
-
-        x = self.root
+        node.color = NodeColor.BLACK  # leaves are always black
+        return node
 
-        if x == self.TNULL:
+    def insert(self, key):
+        if self.root == self.TNULL:
+            node = self.new_leaf(key)
+            node.data.points_array = node.data.convex_hull
             self.root = node
+            self.size = 1
             return
 
-        left_neighbour, right_neighbour = self.down(x, key)
-
-        new_node_parent = Node(NodeData())
-        node.parent = new_node_parent
+        leaf = self.down(self.root, key)
+        leaf_point = leaf.data.left_most_right_point
 
-        if left_neighbour is None:
-            new_node_parent.left = node
-            new_node_parent.right = right_neighbour
-
-            new_node_parent.parent = right_neighbour.parent
-            if right_neighbour.parent is None:
-                self.root = new_node_parent
-                new_node_parent.parent = self.TNULL
-            else:
-                right_neighbour.parent.left = new_node_parent
-
-            right_neighbour.parent = new_node_parent
-
-        elif right_neighbour is None:
-            new_node_parent.right = node
-            new_node_parent.left = left_neighbour
-
-            new_node_parent.parent = left_neighbour.parent
-            if left_neighbour.parent is None:
-                self.root = new_node_parent
-                new_node_parent.parent = self.TNULL
-            else:
-                left_neighbour.parent.right = new_node_parent
-
-            left_neighbour.parent = new_node_parent
+        if leaf_point.x == key.x and leaf_point.y == key.y:
+            return
 
-        elif self.find_brother(left_neighbour)[0] == right_neighbour:
-            new_node_parent.left = left_neighbour
-            new_node_parent.right = node
+        node = self.new_leaf(key)
+        self.size += 1
 
-            new_node_parent.parent = left_neighbour.parent
-            left_neighbour.parent.left = new_node_parent
+        new_node_parent = Node(NodeData())
+        new_node_parent.color = NodeColor.RED
 
-            left_neighbour.parent = new_node_parent
+        if self.precedes(key, leaf_point):
+            new_node_parent.left, new_node_parent.right = node, leaf
         else:
-            new_node_parent.left = node
-            new_node_parent.right = right_neighbour
+            new_node_parent.left, new_node_parent.right = leaf, node
 
-            new_node_parent.parent = right_neighbour.parent
+        new_node_parent.data.left_most_right = new_node_parent.left
+        new_node_parent.data.left_most_right_point = new_node_parent.left.data.left_most_right_point
 
-            neighbour_side = right_neighbour.node_side()
-            if neighbour_side == NodeSide.LEFT:
-                right_neighbour.parent.left = new_node_parent
-            else:
-                right_neighbour.parent.right = new_node_parent
+        new_node_parent.parent = leaf.parent
+        if leaf.parent == self.TNULL:
+            self.root = new_node_parent
+        elif leaf.node_side() == NodeSide.LEFT:
+            leaf.parent.left = new_node_parent
+        else:
+            leaf.parent.right = new_node_parent
 
-            right_neighbour.parent = new_node_parent
+        node.parent = new_node_parent
+        leaf.parent = new_node_parent
 
         self.up(node)
-
-        if node.parent == self.TNULL:
-            node.color = NodeColor.BLACK
-            return
-
-        if node.parent.parent == self.TNULL:
-            return
-
-    def down(self, current_node: Node, point: Point, left_neighbour: Node = None, right_neighbour: Node = None):
-        if current_node.left == self.TNULL:
-            if point.x <= current_node.data.left_most_right_point.x:
-                right_neighbour = current_node
+        self.fix_insert(new_node_parent)
+
+    def fix_insert(self, node: Node):
+        while node.parent.color == NodeColor.RED:
+            if node.parent == node.parent.parent.right:
+                uncle = node.parent.parent.left
+                if uncle.color == NodeColor.RED:
+                    uncle.color = NodeColor.BLACK
+                    node.parent.color = NodeColor.BLACK
+                    node.parent.parent.color = NodeColor.RED
+                    node = node.parent.parent
+                else:
+                    if node == node.parent.left:
+                        node = node.parent
+                        self.right_rotate(node)
+                    node.parent.color = NodeColor.BLACK
+                    node.parent.parent.color = NodeColor.RED
+                    self.left_rotate(node.parent.parent)
             else:
-                left_neighbour = current_node
-            return left_neighbour, right_neighbour
-
-        left_queue = current_node.data.convex_hull[:current_node.data.separating_index + 1]
-        right_queue = current_node.data.convex_hull[current_node.data.separating_index + 1:]
-
-        left_son = current_node.left
-        right_son = current_node.right
-
-        if left_son.left != self.TNULL:
-            left_son.data.convex_hull = left_queue + left_son.data.points_array
-
-        if right_son.left != self.TNULL:
-            right_son.data.convex_hull = right_son.data.points_array + right_queue
-
-        if point.x <= current_node.data.left_most_right_point.x:
-            right_neighbour = current_node
-            current_node = current_node.left
-
-        else:
-            left_neighbour = current_node.data.left_most_right
-            current_node = current_node.right
+                uncle = node.parent.parent.right
+                if uncle.color == NodeColor.RED:
+                    uncle.color = NodeColor.BLACK
+                    node.parent.color = NodeColor.BLACK
+                    node.parent.parent.color = NodeColor.RED
+                    node = node.parent.parent
+                else:
+                    if node == node.parent.right:
+                        node = node.parent
+                        self.left_rotate(node)
+                    node.parent.color = NodeColor.BLACK
+                    node.parent.parent.color = NodeColor.RED
+                    self.right_rotate(node.parent.parent)
+            if node == self.root:
+                break
+        self.root.color = NodeColor.BLACK
+
+    def down(self, current_node: Node, point: Point):
+        while current_node.left != self.TNULL:
+            if not self.precedes(current_node.data.left_most_right_point, point):
+                current_node = current_node.left
+            else:
+                current_node = current_node.right
 
-        return self.down(current_node, point, left_neighbour, right_neighbour)
+        return current_node
 
     def up(self, current_node: Node):
-        if current_node == self.get_root():
-            current_node.data.points_array = current_node.data.convex_hull
-            return
+        while current_node != self.get_root():
+            current_node = current_node.parent
+            self.bridge(current_node)
 
-        current_brother, side = self.find_brother(current_node)
+            current_node.data.left_most_right = self.find_left_most_right(current_node)
+            current_node.data.left_most_right_point = current_node.data.left_most_right.data.left_most_right_point
 
-        q_1, q_2, q_3, q_4, j = [], [], [], [], 0
-        if side == NodeSide.LEFT:
-            q_1, q_2, q_3, q_4, j = merge_chains(current_brother.data.convex_hull, current_node.data.convex_hull)
-        elif side == NodeSide.RIGHT:
-            q_1, q_2, q_3, q_4, j = merge_chains(current_node.data.convex_hull, current_brother.data.convex_hull)
+        current_node.data.points_array = current_node.data.convex_hull
 
-        current_node.parent.left.data.points_array = q_2
-        current_node.parent.right.data.points_array = q_3
+    def bridge(self, node: Node):
+        chain_1 = node.left.data.convex_hull
+        chain_2 = node.right.data.convex_hull
+        index_1, index_2 = find_bridge(chain_1, chain_2, self.reverse, self.bounds)
 
-        current_node.parent.data.convex_hull = q_1 + q_4
-        current_node.parent.data.separating_index = j
+        q_1, q_2 = chain_1.split(index_1 + 1)
+        q_3, q_4 = chain_2.split(index_2)
 
-        current_node.parent.data.left_most_right = self.find_left_most_right(current_node.parent)
-        current_node.parent.data.left_most_right_point = current_node.parent.data.left_most_right.data.left_most_right_point
+        node.left.data.points_array = q_2
+        node.right.data.points_array = q_3
 
-        self.up(current_node.parent)
+        node.data.convex_hull = q_1 + q_4
+        node.data.separating_index = index_1
+
+        if node == self.get_root():
+            node.data.points_array = node.data.convex_hull
 
     def find_brother(self, node: Node):
         if node.parent.left == node:
             return node.parent.right, NodeSide.RIGHT
         elif node.parent.right == node:
             return node.parent.left, NodeSide.LEFT
-        return self.TNULL
+        return self.TNULL, NodeSide.ERROR
 
     def find_left_most_right(self, node: Node):
         current_node = node
@@ -212,47 +219,236 @@ class RedBlackTree:
     def get_root(self):
         return self.root
 
-    def delete(self, data):
-        node = Node(NodeData(data))
-        node.parent = None
-        node.data.left_most_right = node
-        node.left = self.TNULL
-        node.right = self.TNULL
-        node.color = NodeColor.RED  # new node must be red
+    def height(self):
+        return self.get_root().height(self.TNULL)
 
-        x = self.root
+    def delete(self, data):
+        if self.root == self.TNULL:
+            return
 
-        _, to_delete_node = self.down(x, data)
+        to_delete_node = self.down(self.root, data)
 
-        if to_delete_node is None or \
-                (to_delete_node.data.left_most_right_point.x != data.x or
-                 to_delete_node.data.left_most_right_point.y != data.y):
+        if to_delete_node.data.left_most_right_point.x != data.x or \
+                to_delete_node.data.left_most_right_point.y != data.y:
             return
-        elif to_delete_node == self.get_root():
+
+        self.size -= 1
+
+        if to_delete_node == self.get_root():
             self.root = self.TNULL
-        elif to_delete_node.parent.parent == self.TNULL:
-            brother, _ = self.find_brother(to_delete_node)
+            return
 
-            brother.data.points_array = brother.data.convex_hull
+        node_parent = to_delete_node.parent
+        brother, _ = self.find_brother(to_delete_node)
 
+        brother.parent = node_parent.parent
+        if node_parent.parent == self.TNULL:
             self.root = brother
-            brother.parent = self.TNULL
+        elif node_parent.node_side() == NodeSide.LEFT:
+            node_parent.parent.left = brother
         else:
-            node_parent = to_delete_node.parent
-            brother, _ = self.find_brother(to_delete_node)
+            node_parent.parent.right = brother
+
+        self.up(brother)
+
+        if node_parent.color == NodeColor.BLACK:
+            self.fix_delete(brother)
+
+    def fix_delete(self, node: Node):
+        while node != self.root and node.color == NodeColor.BLACK:
+            if node == node.parent.left:
+                brother = node.parent.right
+                if brother.color == NodeColor.RED:
+                    brother.color = NodeColor.BLACK
+                    node.parent.color = NodeColor.RED
+                    self.left_rotate(node.parent)
+                    brother = node.parent.right
+
+                if brother.left.color == NodeColor.BLACK and brother.right.color == NodeColor.BLACK:
+                    brother.color = NodeColor.RED
+                    node = node.parent
+                else:
+                    if brother.right.color == NodeColor.BLACK:
+                        brother.left.color = NodeColor.BLACK
+                        brother.color = NodeColor.RED
+                        self.right_rotate(brother)
+                        brother = node.parent.right
+
+                    brother.color = node.parent.color
+                    node.parent.color = NodeColor.BLACK
+                    brother.right.color = NodeColor.BLACK
+                    self.left_rotate(node.parent)
+                    node = self.root
+            else:
+                brother = node.parent.left
+                if brother.color == NodeColor.RED:
+                    brother.color = NodeColor.BLACK
+                    node.parent.color = NodeColor.RED
+                    self.right_rotate(node.parent)
+                    brother = node.parent.left
+
+                if brother.right.color == NodeColor.BLACK and brother.left.color == NodeColor.BLACK:
+                    brother.color = NodeColor.RED
+                    node = node.parent
+                else:
+                    if brother.left.color == NodeColor.BLACK:
+                        brother.right.color = NodeColor.BLACK
+                        brother.color = NodeColor.RED
+                        self.left_rotate(brother)
+                        brother = node.parent.left
+
+                    brother.color = node.parent.color
+                    node.parent.color = NodeColor.BLACK
+                    brother.left.color = NodeColor.BLACK
+                    self.right_rotate(node.parent)
+                    node = self.root
+        node.color = NodeColor.BLACK
+
+    def build(self, points):
+        # replaces the tree with a balanced one over points, which must be sorted and free of duplicates
+        self.root = self.TNULL
+        self.size = len(points)
+        self.magnitude = 0.0
+        self.bounds = filter_bounds(0.0)
+
+        if not points:
+            return
+
+        leaf_depth = (len(points) - 1).bit_length()
+        self.root, _ = self.build_subtree(points, 0, len(points), 0, leaf_depth)
+        self.root.color = NodeColor.BLACK
+        self.root.data.points_array = self.root.data.convex_hull
+
+    def build_subtree(self, points, start, stop, depth, leaf_depth):
+        # returns the subtree over points[start:stop] and its right most leaf
+        if stop - start == 1:
+            leaf = self.new_leaf(points[start])
+            return leaf, leaf
+
+        middle = (start + stop) // 2
+        left_son, left_last = self.build_subtree(points, start, middle, depth + 1, leaf_depth)
+        right_son, right_last = self.build_subtree(points, middle, stop, depth + 1, leaf_depth)
+
+        node = Node(NodeData())
+        node.parent = self.TNULL
+        node.left = left_son
+        node.right = right_son
+        left_son.parent = node
+        right_son.parent = node
+
+        # only the last internal level can hold leaves on both of the two possible depths,
+        # making it red evens out the black heights
+        node.color = NodeColor.RED if depth == leaf_depth - 1 else NodeColor.BLACK
+
+        node.data.left_most_right = left_last
+        node.data.left_most_right_point = node.data.left_most_right.data.left_most_right_point
+
+        self.bridge(node)
+
+        return node, right_last
+
+    def points(self):
+        stack = []
+        node = self.get_root()
+
+        while stack or node != self.TNULL:
+            while node != self.TNULL:
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+            if node.left == self.TNULL:
+                yield node.data.left_most_right_point
+            node = node.right
+
+    def filter_bound(self, point: Point):
+        # float turns beyond it decide orientation tests of point against the tree's points, one per query
+        magnitude = max(self.magnitude, abs(point.x), abs(point.y))
+        return ORIENTATION_FILTER * magnitude * magnitude
+
+    def chain(self):
+        # the hull of all points, ordered like the leaves
+        if self.root == self.TNULL:
+            return EMPTY_QUEUE
+        return self.root.data.points_array
+
+    def chain_contains(self, point: Point):
+        # point is on or below the chain (above it for the reversed tree)
+        chain = self.chain()
+        if not chain or self.precedes(point, chain[0]) or self.precedes(chain[-1], point):
+            return False
+
+        index = chain.bisect(lambda vertex, _: not self.precedes(vertex, point))
+        predecessor, vertex, _ = chain.window(index)
+        if predecessor is None:
+            return True
+
+        # point left of vertex -> predecessor, the semi-static filter inlined as in find_bridge
+        high = self.filter_bound(point)
+        ax, ay, bx, by, x, y = vertex.x, vertex.y, predecessor.x, predecessor.y, point.x, point.y
+        determinant = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+        return determinant > high or (determinant >= -high and orientation(ax, ay, bx, by, x, y) >= 0)
+
+    def chain_extreme(self, dx, dy):
+        # vertex furthest in direction (dx, dy), which has to point up (down for the reversed tree):
+        # the edges turn clockwise, so moving along them stops paying off only once
+        chain = self.chain()
+        if not chain:
+            return None
+
+        return chain[chain.bisect(lambda vertex, successor: successor is None or
+                                  dx * (successor.x - vertex.x) + dy * (successor.y - vertex.y) <= 0)]
+
+    def tangent_candidates(self, point: Point):
+        # Vertices where the edges seen from point start or stop being visible. Split at point, visibility
+        # changes at most once on either side, so each change is found by one binary search. The tangent
+        # points of the whole hull are among these vertices and the ends of the chain.
+        chain = self.chain()
+        if not chain:
+            return []
+
+        high = self.filter_bound(point)
+        x, y = point.x, point.y
+
+        def visible(vertex, successor):
+            # point strictly right of successor -> vertex
+            ax, ay, bx, by = successor.x, successor.y, vertex.x, vertex.y
+            determinant = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+            return determinant < -high or (determinant <= high and orientation(ax, ay, bx, by, x, y) < 0)
+
+        split = chain.bisect(lambda vertex, _: not self.precedes(vertex, point))
+        first_visible = chain.bisect(lambda vertex, successor: successor is None or
+                                     not self.precedes(successor, point) or visible(vertex, successor))
+        last_visible = chain.bisect(lambda vertex, successor: not self.precedes(vertex, point) and
+                                    (successor is None or not visible(vertex, successor)))
+
+        indices = {0, len(chain) - 1, split - 1, split, first_visible, last_visible}
+        return [chain[index] for index in indices if 0 <= index < len(chain)]
+
+    def insert_many(self, keys):
+        keys = list(keys)
+
+        # rebuilding costs about as much as inserting as many points as the tree already holds
+        if len(keys) >= self.size:
+            self.build(unique_sorted(list(self.points()) + keys, self.reverse))
+            return
 
-            side = node_parent.node_side()
+        for key in keys:
+            self.insert(key)
 
-            if side == NodeSide.LEFT:
-                node_parent.parent.left = brother
-            elif side == NodeSide.RIGHT:
-                node_parent.parent.right = brother
+    def delete_many(self, keys):
+        keys = list(keys)
 
-            brother.parent = node_parent.parent
-            self.up(brother)
+        if len(keys) >= self.size // 2:
+            to_delete = {(key.x, key.y) for key in keys}
+            self.build([point for point in self.points() if (point.x, point.y) not in to_delete])
+            return
+
+        for key in keys:
+            self.delete(key)
 
-    def plot(self, fig, ax, reverse=False):
-        return self.get_root().plot(fig, ax, self.TNULL, reverse=reverse)
+    def plot(self, fig, ax):
+        return self.get_root().plot(fig, ax, self.TNULL)
 
     def graph_viz(self):
         string = "digraph g {\n"
@@ -263,26 +459,34 @@ class RedBlackTree:
         return wrapper[0] + "}\n"
 
 
-def merge_chains(chain_1: [], chain_2: []):
-    if len(chain_2) == 1:
-        if len(chain_1) == 1:
-            return chain_1, [], [], chain_2, 0
+def unique_sorted(points, reverse=False):
+    points = sorted(points, reverse=reverse)
 
-        if len(chain_1) == 2:
-            if is_left(chain_1[0], chain_1[1], chain_2[0]):
-                return chain_1[:1], chain_1[1:], [], chain_2, 0
-            else:
-                return chain_1, [], [], chain_2, 1
+    unique_points = []
+    for point in points:
+        if not unique_points or unique_points[-1].x != point.x or unique_points[-1].y != point.y:
+            unique_points.append(point)
 
-    if len(chain_1) == 1:
-        if is_left(chain_2[0], chain_2[1], chain_1[0]):
-            return chain_1, [], chain_2[:1], chain_2[1:], 0
-        else:
-            return chain_1, [], [], chain_2, 0
+    return unique_points
+
+
+# point classes as plain ints, comparing those is cheaper than looking up enum members in the bridge search
+CONVEX = PointClass.CONVEX.value
+CONCAVE = PointClass.CONCAVE.value
+SUPPORTING = PointClass.SUPPORTING.value
 
-    index_1 = int((len(chain_1) - 1) / 2)
 
-    index_2 = int((len(chain_2) - 1) / 2)
+def find_bridge(chain_1: ConcatenableQueue, chain_2: ConcatenableQueue, reverse=False, bounds=NO_BOUNDS):
+    # Overmars–van Leeuwen bridge search; every point of chain_1 precedes every point of chain_2.
+    # All four classification tests are orientations against the line q1 q2. bounds are the filter_bounds
+    # of the largest coordinate, they settle most tests in floats; only the few values inside them go
+    # through the adaptive predicates of GeometryKernel.
+    max_left = chain_1[-1]
+    max_left_x = max_left.x
+    low, high, offset_low, offset_high = bounds
+
+    window_1 = chain_1.window
+    window_2 = chain_2.window
 
     temp_min_1 = 0
     temp_max_1 = len(chain_1) - 1
@@ -290,155 +494,80 @@ def merge_chains(chain_1: [], chain_2: []):
     temp_min_2 = 0
     temp_max_2 = len(chain_2) - 1
 
-    # is_extreme_point_left_1 = False
-    # is_extreme_point_right_1 = False
-
-    # is_extreme_point_left_2 = False
-    # is_extreme_point_right_2 = False
-
     while True:
-        is_extreme_point_left_1 = False
-        is_extreme_point_right_1 = False
-
-        is_extreme_point_left_2 = False
-        is_extreme_point_right_2 = False
-
-        if index_1 == temp_min_1:
-            is_extreme_point_left_1 = True
-        if index_1 == temp_max_1:
-            is_extreme_point_right_1 = True
-
-        if index_2 == temp_min_2:
-            is_extreme_point_left_2 = True
-        if index_2 == temp_max_2:
-            is_extreme_point_right_2 = True
-
-        # type_1 = PointClass.ERROR
-        # type_2 = PointClass.ERROR
-
-        if is_extreme_point_left_1 and is_extreme_point_right_1:
-            type_1 = PointClass.SUPPORTING
-
-        elif is_extreme_point_left_1:
-            type_1 = define_point_type_left(Point(chain_1[index_1].x, chain_1[index_1].y - 1),
-                                            chain_1[index_1],
-                                            chain_1[index_1 + 1], chain_2[index_2])
-        elif is_extreme_point_right_1:
-            type_1 = define_point_type_left(chain_1[index_1 - 1], chain_1[index_1],
-                                            Point(chain_1[index_1].x, chain_1[index_1].y - 1),
-                                            chain_2[index_2])
+        index_1 = (temp_min_1 + temp_max_1) // 2
+        index_2 = (temp_min_2 + temp_max_2) // 2
+
+        q1_pred, q1, q1_suc = window_1(index_1)
+        q2_pred, q2, q2_suc = window_2(index_2)
+        x1, y1 = q1.x, q1.y
+        dx, dy = q2.x - x1, q2.y - y1
+
+        # a float turn beyond the bounds decides a test, one inside them is passed to the adaptive predicate
+        if q1_pred is not None and ((turn := dx * (q1_pred.y - y1) - dy * (q1_pred.x - x1)) > high or
+                                    turn >= low and orientation(x1, y1, q2.x, q2.y, q1_pred.x, q1_pred.y) >= 0):
+            type_1 = CONVEX
+        elif q1_suc is not None and ((turn := dx * (q1_suc.y - y1) - dy * (q1_suc.x - x1)) > high or
+                                     turn >= low and orientation(x1, y1, q2.x, q2.y, q1_suc.x, q1_suc.y) > 0):
+            type_1 = CONCAVE
         else:
-            type_1 = define_point_type_left(chain_1[index_1 - 1], chain_1[index_1], chain_1[index_1 + 1],
-                                            chain_2[index_2])
-
-        if is_extreme_point_left_2 and is_extreme_point_right_2:
-            type_2 = PointClass.SUPPORTING
-
-        elif is_extreme_point_left_2:
-            type_2 = define_point_type_right(Point(chain_2[index_2].x, chain_2[index_2].y - 1),
-                                             chain_2[index_2],
-                                             chain_2[index_2 + 1], chain_1[index_1])
-        elif is_extreme_point_right_2:
-            type_2 = define_point_type_right(chain_2[index_2 - 1], chain_2[index_2],
-                                             Point(chain_2[index_2].x, chain_2[index_2].y - 1),
-                                             chain_1[index_1])
+            type_1 = SUPPORTING
+
+        if q2_suc is not None and ((turn := dx * (q2_suc.y - y1) - dy * (q2_suc.x - x1)) > high or
+                                   turn >= low and orientation(x1, y1, q2.x, q2.y, q2_suc.x, q2_suc.y) >= 0):
+            type_2 = CONVEX
+        elif q2_pred is not None and ((turn := dx * (q2_pred.y - y1) - dy * (q2_pred.x - x1)) > high or
+                                      turn >= low and orientation(x1, y1, q2.x, q2.y, q2_pred.x, q2_pred.y) > 0):
+            type_2 = CONCAVE
         else:
-            type_2 = define_point_type_right(chain_2[index_2 - 1], chain_2[index_2], chain_2[index_2 + 1],
-                                             chain_1[index_1])
-
-        if type_1 == PointClass.CONCAVE and type_2 == PointClass.CONCAVE:
-            check_result = concave_concave_case(chain_1[index_1], chain_1[index_1 + 1], chain_1[temp_max_1],
-                                                chain_2[temp_min_2], chain_2[index_2 - 1], chain_2[index_2])
-            if check_result == NodeSide.LEFT:
-                temp_min_1 = index_1
-                if temp_max_1 - index_1 != 1:
-                    index_1 = int((index_1 + temp_max_1) / 2)
-                else:
-                    index_1 = temp_max_1
-            elif check_result == NodeSide.RIGHT:
-                temp_max_2 = index_2
-                index_2 = int((temp_min_2 + index_2) / 2)
-            else:
-                temp_min_1 = index_1
-                if temp_max_1 - index_1 != 1:
-                    index_1 = int((index_1 + temp_max_1) / 2)
-                else:
-                    index_1 = temp_max_1
-                temp_max_2 = index_2
-                index_2 = int((temp_min_2 + index_2) / 2)
-
-        elif type_1 == PointClass.CONCAVE and type_2 == PointClass.SUPPORTING:
-            temp_min_1 = index_1
-            if temp_max_1 - index_1 != 1:
-                index_1 = int((index_1 + temp_max_1) / 2)
-            else:
-                index_1 = temp_max_1
-
-            temp_min_2 = index_2
-            # index_2 = int((index_2 + temp_max_2) / 2)
-
-        elif type_1 == PointClass.CONCAVE and type_2 == PointClass.CONVEX:
-            temp_min_2 = index_2
-            if temp_max_2 - index_2 != 1:
-                index_2 = int((index_2 + temp_max_2) / 2)
-            else:
-                index_2 = temp_max_2
+            type_2 = SUPPORTING
 
-        elif type_1 == PointClass.SUPPORTING and type_2 == PointClass.CONCAVE:
+        if type_1 == SUPPORTING:
+            if type_2 == SUPPORTING:
+                break
             temp_max_1 = index_1
-            # index_1 = int((temp_min_1 + index_1) / 2)
-
-            temp_max_2 = index_2
-            index_2 = int((temp_min_2 + index_2) / 2)
-
-        elif type_1 == PointClass.SUPPORTING and type_2 == PointClass.SUPPORTING:
-            break
-
-        elif type_1 == PointClass.SUPPORTING and type_2 == PointClass.CONVEX:
-            temp_max_1 = index_1
-            # index_1 = int((temp_min_1 + index_1) / 2)
-
-            temp_min_2 = index_2
-            if temp_max_2 - index_2 != 1:
-                index_2 = int((index_2 + temp_max_2) / 2)
+            if type_2 == CONCAVE:
+                temp_max_2 = index_2 - 1
             else:
-                index_2 = temp_max_2
-
-        elif type_1 == PointClass.CONVEX and type_2 == PointClass.CONCAVE:
-            temp_max_1 = index_1
-            index_1 = int((temp_min_1 + index_1) / 2)
-
-        elif type_1 == PointClass.CONVEX and type_2 == PointClass.SUPPORTING:
-            temp_max_1 = index_1
-            index_1 = int((temp_min_1 + index_1) / 2)
-
-            temp_min_2 = index_2
-            # index_2 = int((index_2 + temp_max_2) / 2)
-
-        elif type_1 == PointClass.CONVEX and type_2 == PointClass.CONVEX:
-            temp_max_1 = index_1
-            index_1 = int((temp_min_1 + index_1) / 2)
-
+                temp_min_2 = index_2 + 1
+        elif type_2 == SUPPORTING:
             temp_min_2 = index_2
-            if temp_max_2 - index_2 != 1:
-                index_2 = int((index_2 + temp_max_2) / 2)
+            if type_1 == CONCAVE:
+                temp_min_1 = index_1 + 1
             else:
-                index_2 = temp_max_2
+                temp_max_1 = index_1 - 1
+        elif type_1 == CONVEX or type_2 == CONVEX:
+            if type_1 == CONVEX:
+                temp_max_1 = index_1 - 1
+            if type_2 == CONVEX:
+                temp_min_2 = index_2 + 1
+        else:
+            # both concave: where the lines q1 q1_suc and q2_pred q2 cross, compared with max_left without
+            # division (see intersection_side); concave_concave_case decides what the bounds cannot
+            ux, vx, vy = q1_suc.x - x1, q2.x - q2_pred.x, q2.y - q2_pred.y
+            denominator = ux * vy - (q1_suc.y - y1) * vx
+            offset = (x1 - max_left_x) * denominator + ux * ((q2_pred.x - x1) * vy - (q2_pred.y - y1) * vx)
+
+            if low <= denominator <= high or offset_low <= offset <= offset_high:
+                crosses_right = concave_concave_case(q1, q1_suc, max_left, q2_pred, q2, reverse) == NodeSide.RIGHT
+            else:
+                # the crossing lies right of max_left in the plain order when offset and denominator agree
+                crosses_right = ((offset > 0) == (denominator > 0)) != reverse
 
-    q_1 = chain_1[:index_1 + 1]
-    q_2 = chain_1[index_1 + 1:]
-    q_3 = chain_2[:index_2]
-    q_4 = chain_2[index_2:]
-    j = index_1
+            if crosses_right:
+                temp_max_2 = index_2 - 1
+            else:
+                temp_min_1 = index_1 + 1
 
-    return q_1, q_2, q_3, q_4, j
+    return index_1, index_2
 
 
-def concave_concave_case(q1, q1_successor, max_left, min_right, q2_predecessor, q2):
-    center_line_x = (max_left.x + min_right.x) / 2
-    if get_intersect_point(q1, q1_successor, q2_predecessor, q2).x < center_line_x:
-        return NodeSide.LEFT
-    elif get_intersect_point(q1, q1_successor, q2_predecessor, q2).x > center_line_x:
+def concave_concave_case(q1, q1_successor, max_left, q2_predecessor, q2, reverse=False):
+    # The tangent lines at q1 and q2 cross on one side of the line separating the chains;
+    # the bridge cannot end at or before q1 if they cross left of it, nor at or after q2 otherwise.
+    side = intersection_side(q1.x, q1.y, q1_successor.x, q1_successor.y, q2_predecessor.x, q2_predecessor.y,
+                             q2.x, q2.y, max_left.x, max_left.y)
+    # side compares the crossing with max_left in the plain x, y order, a reversed tree walks it backwards
+    if (side < 0 if reverse else side > 0):
         return NodeSide.RIGHT
-    else:
-        return NodeSide.ERROR
+    return NodeSide.LEFT
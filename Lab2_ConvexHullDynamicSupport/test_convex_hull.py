@@ -0,0 +1,227 @@
+import math
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from GeometryKernel.predicates import exact_orientation
+from Lab2_ConvexHullDynamicSupport.convex_hull import ConvexHull
+from Lab2_ConvexHullDynamicSupport.node import NodeColor
+from Lab2_ConvexHullDynamicSupport.point import Point
+
+# Brute force references: the hull of the points alive after every operation by Andrew's monotone chain with
+# exact orientations, the queries by testing every point exactly. The trees are compared with those along
+# random insert/delete streams, single and batched, on point sets that keep the red-black fix-ups, the
+# bridges of the persistent queues and the exact predicates busy.
+
+
+def reference_hull(points):
+    # (upper, lower) as coordinates from the left most to the right most point, collinear points left out
+    points = sorted(set(points))
+    upper, lower = [], []
+    for point in points:
+        while len(upper) > 1 and exact_orientation(*upper[-2], *upper[-1], *point) >= 0:
+            upper.pop()
+        upper.append(point)
+        while len(lower) > 1 and exact_orientation(*lower[-2], *lower[-1], *point) <= 0:
+            lower.pop()
+        lower.append(point)
+    return upper, lower
+
+
+def coordinates(chain):
+    return [(point.x, point.y) for point in chain]
+
+
+def check_tree(tree, points):
+    # red-black invariants, the leaves in order, the routing points and every node's hull that of its leaves;
+    # the reversed tree keeps the lower hull from right to left
+    leaves = []
+
+    def visit(node):
+        # returns the black height
+        if node.left == tree.TNULL:
+            assert node.right == tree.TNULL and node.color == NodeColor.BLACK
+            leaves.append(node.data.left_most_right_point)
+            return 1
+        if node.color == NodeColor.RED:
+            assert node.left.color == NodeColor.BLACK and node.right.color == NodeColor.BLACK
+        assert node.left.parent is node and node.right.parent is node
+
+        start = len(leaves)
+        left_height = visit(node.left)
+        assert node.data.left_most_right_point is leaves[-1]
+        assert visit(node.right) == left_height
+
+        upper, lower = reference_hull(coordinates(leaves[start:]))
+        assert coordinates(node.data.convex_hull) == (lower[::-1] if tree.reverse else upper)
+
+        # the sons keep what their bridge cuts off their hulls, left of it and right of it
+        left_hull, right_hull = node.left.data.convex_hull, node.right.data.convex_hull
+        index_1 = node.data.separating_index
+        index_2 = len(right_hull) - (len(node.data.convex_hull) - index_1 - 1)
+        assert list(node.left.data.points_array) == list(left_hull)[index_1 + 1:]
+        assert list(node.right.data.points_array) == list(right_hull)[:index_2]
+        return left_height + (node.color == NodeColor.BLACK)
+
+    if tree.root != tree.TNULL:
+        assert tree.root.color == NodeColor.BLACK
+        visit(tree.root)
+        assert tree.height() <= 2 * math.log2(len(leaves) + 1) + 1
+    assert coordinates(leaves) == sorted(points, reverse=tree.reverse)
+    assert tree.size == len(leaves)
+
+
+def check_hull(convex_hull, points, full=True):
+    # the chains and vertex_count against the reference, the trees as well unless full is False
+    upper, lower = reference_hull(points)
+    assert coordinates(convex_hull.upper_hull.chain()) == upper
+    assert coordinates(convex_hull.lower_hull.chain()) == lower[::-1]
+    assert convex_hull.vertex_count() == (len(upper) + len(lower) - 2 if len(upper) > 1 else len(upper))
+
+    # both trees hold the same point objects
+    upper_points = list(convex_hull.upper_hull.bst.points())
+    lower_points = list(convex_hull.lower_hull.bst.points())
+    assert all(point is other for point, other in zip(upper_points, reversed(lower_points)))
+
+    if full:
+        check_tree(convex_hull.upper_hull.bst, points)
+        check_tree(convex_hull.lower_hull.bst, points)
+
+
+def check_queries(convex_hull, points, queries, directions):
+    upper, lower = reference_hull(points)
+    vertices = set(upper + lower)
+
+    for x, y in queries:
+        point = Point(x, y, to_delete=True)
+        inside = bool(points) and reference_hull(points + [(x, y)]) == (upper, lower)
+        assert convex_hull.contains(point) == inside
+
+        tangents = convex_hull.tangents(point)
+        if inside or not points:
+            assert tangents is None
+        else:
+            left, right = tangents
+            assert (left.x, left.y) in vertices and (right.x, right.y) in vertices
+            assert all(exact_orientation(x, y, left.x, left.y, *vertex) <= 0 for vertex in vertices)
+            assert all(exact_orientation(x, y, right.x, right.y, *vertex) >= 0 for vertex in vertices)
+
+    for dx, dy in directions:
+        extreme = convex_hull.extreme_point((dx, dy))
+        if not points:
+            assert extreme is None
+            continue
+        best = max(Fraction(dx) * Fraction(x) + Fraction(dy) * Fraction(y) for x, y in points)
+        assert (extreme.x, extreme.y) in vertices
+        assert Fraction(dx) * Fraction(extreme.x) + Fraction(dy) * Fraction(extreme.y) == best
+
+
+def sorted_x(rng, n):
+    return [(float(x), rng.uniform(-n, n)) for x in range(n)]
+
+
+def integer_grid(rng, n):
+    return [(float(rng.randint(0, 6)), float(rng.randint(0, 6))) for _ in range(n)]
+
+
+def collinear(rng, n):
+    # one line, exactly representable, and a few points off it
+    points = [(float(x), 2.0 * x + 1.0) for x in rng.sample(range(-n, n), n)]
+    return points + [(float(rng.randint(-n, n)), float(rng.randint(-n, n))) for _ in range(n // 8)]
+
+
+def near_collinear(rng, n):
+    # points of a line rounded to floats and scaled, the float orientations are noise
+    scale = 10.0 ** rng.choice([-8, -4, 0, 4, 8])
+    slope, shift = rng.uniform(-2, 2), rng.uniform(-1, 1)
+    return [(x * scale, (slope * x + shift) * scale) for x in (rng.uniform(-1, 1) for _ in range(n))]
+
+
+POINT_SETS = {function.__name__: function for function in (sorted_x, integer_grid, collinear, near_collinear)}
+
+
+def queries_for(rng, points, n):
+    # random points around the set, its points, points on its segments and on the hull's edges
+    xs, ys = [x for x, _ in points], [y for _, y in points]
+    low_x, high_x, low_y, high_y = min(xs), max(xs), min(ys), max(ys)
+    span = max(high_x - low_x, high_y - low_y) or 1.0
+    queries = [(rng.uniform(low_x - span, high_x + span), rng.uniform(low_y - span, high_y + span)) for _ in range(n)]
+    queries += rng.sample(points, min(n, len(points)))
+    for _ in range(n):
+        (ax, ay), (bx, by) = rng.choice(points), rng.choice(points)
+        t = rng.choice([0.5, 0.25, rng.random()])
+        queries.append((ax + t * (bx - ax), ay + t * (by - ay)))
+    return queries
+
+
+@pytest.mark.parametrize("name", list(POINT_SETS))
+def test_single_updates(name):
+    rng = random.Random(name)
+    for _ in range(25):
+        pool = POINT_SETS[name](rng, rng.randint(2, 30))
+        convex_hull, alive = ConvexHull(), set()
+
+        for _ in range(3 * len(pool)):
+            x, y = rng.choice(pool)
+            if rng.random() < 0.6:
+                convex_hull.insert(Point(x, y))
+                alive.add((x, y))
+            else:
+                # deleting a point that is not there leaves the hull as it is
+                convex_hull.delete(Point(x, y, to_delete=True))
+                alive.discard((x, y))
+            check_hull(convex_hull, sorted(alive))
+
+        check_queries(convex_hull, sorted(alive), queries_for(rng, pool, 20),
+                      [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(20)] + [(1, 0), (-1, 0), (0, 1)])
+
+
+@pytest.mark.parametrize("name", list(POINT_SETS))
+def test_batch_updates(name):
+    rng = random.Random(name)
+    for _ in range(25):
+        pool = POINT_SETS[name](rng, rng.randint(2, 40))
+        points = [rng.choice(pool) for _ in range(len(pool))]
+
+        alive = set(points)
+        from_list = ConvexHull.from_points([Point(x, y) for x, y in points])
+        from_array = ConvexHull.from_points(np.array(points))
+        check_hull(from_list, sorted(alive))
+        check_hull(from_array, sorted(alive))
+
+        convex_hull = from_list
+        for _ in range(6):
+            # small batches go one by one, large ones rebuild the trees
+            inserted = [rng.choice(pool) for _ in range(rng.choice([1, 3, len(alive) + 1]))]
+            convex_hull.insert_many(Point(x, y) for x, y in inserted)
+            alive.update(inserted)
+            check_hull(convex_hull, sorted(alive))
+
+            deleted = rng.sample(pool, rng.choice([1, len(pool) // 3, len(pool)]))
+            convex_hull.delete_many(Point(x, y, to_delete=True) for x, y in deleted)
+            alive.difference_update(deleted)
+            check_hull(convex_hull, sorted(alive))
+
+        check_queries(convex_hull, sorted(alive), queries_for(rng, pool, 20),
+                      [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(20)])
+
+
+def test_large_stream():
+    # longer random streams, checked at the end of every round: deeper trees and more rotations
+    rng = random.Random(0)
+    convex_hull, alive = ConvexHull(), set()
+    pool = [(float(rng.randint(-50, 50)), float(rng.randint(-50, 50))) for _ in range(400)]
+    for _ in range(10):
+        for _ in range(200):
+            x, y = rng.choice(pool)
+            if rng.random() < 0.55:
+                convex_hull.insert(Point(x, y))
+                alive.add((x, y))
+            else:
+                convex_hull.delete(Point(x, y, to_delete=True))
+                alive.discard((x, y))
+        check_hull(convex_hull, sorted(alive))
+    check_queries(convex_hull, sorted(alive), queries_for(rng, pool, 100),
+                  [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(50)])
@@ -0,0 +1,99 @@
+import random
+from itertools import groupby
+
+import pytest
+
+from Lab2_ConvexHullDynamicSupport.convex_hull import ConvexHull
+from Lab2_ConvexHullDynamicSupport.file_utils import OperationType, apply_operation_chunks, apply_operations, \
+    convert_to_binary, read_binary_operation_chunks, read_operation_chunks, read_operations
+
+# The readers skip what is not an operation: blank lines, comments, rows with a wrong field count, unknown
+# operations, coordinates that are no finite numbers. The line by line reader, the NumPy reader, whose
+# chunks with malformed rows fall back to the line by line parser, and the binary log made from the text
+# must all give the same operations and the same hull.
+
+SKIPPED_LINES = [
+    "",
+    "   ",
+    "# a comment",
+    "  # an indented comment",
+    "i 1",
+    "i 1 2 3",
+    "d",
+    "x 1 2",
+    "insert 1 2",
+    "i nan 2",
+    "d 1 inf",
+    "i -inf 0",
+    "i one 2",
+]
+
+
+def write_log(path, seed, size=300):
+    # operations on a small grid, deletions of points that are there and of some that are not, with the
+    # skipped lines and trailing comments strewn in between
+    rng = random.Random(seed)
+    expected, lines = [], []
+    for _ in range(size):
+        operation = rng.choice("iiid")
+        x, y = rng.randint(-10, 10), rng.randint(-10, 10)
+        line = f"{operation} {x} {y}" if rng.random() < 0.8 else f"{operation} {x}.0 {y}e0  # trailing comment"
+        lines.append(line)
+        expected.append((OperationType.INSERT if operation == "i" else OperationType.DELETE, float(x), float(y)))
+        if rng.random() < 0.15:
+            lines.append(rng.choice(SKIPPED_LINES))
+    path.write_text("\n".join(lines) + "\n")
+    return expected
+
+
+def flatten(runs):
+    # (operation type, x, y) of every operation, whichever way the runs are cut
+    return [(operation_type, x, y) for operation_type, xs, ys in runs for x, y in zip(xs.tolist(), ys.tolist())]
+
+
+def merged(runs):
+    # runs that only a chunk boundary cut apart, joined
+    return [(operation_type, sum(len(xs) for _, xs, _ in group))
+            for operation_type, group in groupby(runs, key=lambda run: run[0])]
+
+
+def chains(convex_hull):
+    return ([(point.x, point.y) for point in convex_hull.upper_hull.chain()],
+            [(point.x, point.y) for point in convex_hull.lower_hull.chain()])
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_readers_agree(tmp_path, seed):
+    text_path, binary_path = tmp_path / "operations.txt", tmp_path / "operations.bin"
+    expected = write_log(text_path, seed)
+
+    operations = list(read_operations(text_path))
+    assert [(operation_type, point.x, point.y) for operation_type, point in operations] == expected
+    runs = [(operation_type, len(list(group)))
+            for operation_type, group in groupby(operations, key=lambda item: item[0])]
+
+    # chunks of a few lines: those holding a malformed row go through the fallback, the others through NumPy
+    for chunk_size in (3, 7, 1 << 16):
+        text_runs = list(read_operation_chunks(text_path, chunk_size))
+        assert flatten(text_runs) == expected
+        assert merged(text_runs) == runs
+
+    assert convert_to_binary(text_path, binary_path, chunk_size=5) == len(expected)
+    for chunk_size in (4, 1 << 16):
+        binary_runs = list(read_binary_operation_chunks(binary_path, chunk_size))
+        assert flatten(binary_runs) == expected
+        assert merged(binary_runs) == runs
+
+    hull = chains(apply_operations(ConvexHull(), read_operations(text_path)))
+    assert chains(apply_operations(ConvexHull(), read_operations(text_path), batch_size=4)) == hull
+    assert chains(apply_operation_chunks(ConvexHull(), read_operation_chunks(text_path, 3))) == hull
+    assert chains(apply_operation_chunks(ConvexHull(), read_binary_operation_chunks(binary_path, 4))) == hull
+
+    # and the hull of replaying the operations one at a time
+    convex_hull = ConvexHull()
+    for operation_type, point in read_operations(text_path):
+        if operation_type == OperationType.INSERT:
+            convex_hull.insert(point)
+        else:
+            convex_hull.delete(point)
+    assert chains(convex_hull) == hull